@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request
 
 from app.core.dependencies import (
     get_auth_service,
     get_current_user,
+    get_token_payload,
     get_user_service,
 )
 from app.models.user import User
-from app.schemas.user import UserLogin, TokenResponse, UserResponse
-from app.core.response import create_success_response
+from app.schemas.user import RefreshTokenRequest, UserLogin, TokenResponse, UserResponse
+from app.core.response import (
+    PydanticJSONResponse,
+    conditional_response,
+    create_success_response,
+    make_etag,
+)
 from app.services.auth_service import AuthService
 from app.services.user_service import UserService
 
@@ -26,13 +32,30 @@ async def login(
     - access_token: 访问令牌
     - token_type: 令牌类型（Bearer）
     - expires_in: 过期时间（秒）
-    - refresh_token: 刷新令牌（可选）
+    - refresh_token: 刷新令牌
+    """
+    return await auth_service.login(login_data.username, login_data.password)
+
+
+@router.post("/refresh", response_model=TokenResponse, status_code=200)
+async def refresh(
+    refresh_data: RefreshTokenRequest = Body(...),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    """
+    刷新令牌
+    
+    使用刷新令牌换取新的访问令牌与刷新令牌（不需要密码，不做密码哈希校验）
+    刷新令牌只能使用一次，重复使用会使整个登录会话失效
     """
-    return auth_service.login(login_data.username, login_data.password)
+    return await auth_service.refresh(refresh_data.refresh_token)
 
 
 @router.post("/logout", status_code=200)
-async def logout(current_user: User = Depends(get_current_user)):
+async def logout(
+    payload: dict = Depends(get_token_payload),
+    auth_service: AuthService = Depends(get_auth_service),
+):
     """
     用户登出
     
@@ -43,13 +66,15 @@ async def logout(current_user: User = Depends(get_current_user)):
         "data": null
     }
     
-    注意：实际应用中可以将 token 加入黑名单
+    撤销当前登录会话：该会话的访问令牌与刷新令牌立即失效
     """
+    await auth_service.logout(payload)
     return create_success_response(data=None, message="登出成功")
 
 
 @router.get("/me", response_model=UserResponse, status_code=200)
 async def get_current_user_info(
+    request: Request,
     current_user: User = Depends(get_current_user),
     user_service: UserService = Depends(get_user_service),
 ):
@@ -57,5 +82,13 @@ async def get_current_user_info(
     获取当前用户信息
     
     需要认证，返回当前登录用户的详细信息
+    支持条件请求（If-None-Match / If-Modified-Since），未变化时返回 304
     """
-    return user_service.get_current_user_info(current_user)
+    return conditional_response(
+        request,
+        lambda: PydanticJSONResponse(
+            content=user_service.get_current_user_info(current_user).model_dump_json()
+        ),
+        etag=make_etag(current_user.id, current_user.updated_at),
+        last_modified=current_user.updated_at,
+    )
@@ -1,17 +1,42 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 
-from app.core.dependencies import get_current_user, get_user_service
-from app.core.response import create_success_response
+from app.core.config import settings
+from app.core.dependencies import get_current_user, get_user_service, user_service_scope
+from app.core.response import (
+    DuplexStreamingResponse,
+    conditional_response,
+    create_success_response,
+    make_etag,
+)
+from app.middleware.compression import no_compression
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, UserResponse
-from app.services.user_service import UserService
+from app.schemas.user import (
+    UserBulkAction,
+    UserCreate,
+    UserListResponse,
+    UserResponse,
+    UserSearchResponse,
+    UserUpdate,
+)
+from app.services.user_service import EXPORT_COLUMNS, UserService
+from app.utils.streaming import (
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    detect_stream_format,
+    encode_csv_rows,
+    encode_ndjson,
+    encode_ndjson_rows,
+    iter_records,
+)
 
 router = APIRouter(prefix="/users", tags=["用户"])
 
 
 @router.get("/me", status_code=200)
 async def get_current_user_info(
+    request: Request,
     current_user: User = Depends(get_current_user),
     user_service: UserService = Depends(get_user_service),
 ):
@@ -20,19 +45,32 @@ async def get_current_user_info(
     
     需要认证，返回当前登录用户的详细信息
     此端点与 /auth/me 功能相同，用于兼容前端 API 路径
+    支持条件请求（If-None-Match / If-Modified-Since），未变化时返回 304
     """
-    user_response = user_service.get_current_user_info(current_user)
-    return create_success_response(
-        data=user_response.model_dump(mode='json'),
-        message="获取用户信息成功",
+    return conditional_response(
+        request,
+        lambda: create_success_response(
+            data=user_service.get_current_user_info(current_user),
+            message="获取用户信息成功",
+        ),
+        etag=make_etag(current_user.id, current_user.updated_at),
+        last_modified=current_user.updated_at,
     )
 
 
 @router.get("", status_code=200)
 async def get_users(
+    request: Request,
     skip: int = Query(0, ge=0, description="跳过记录数"),
     limit: int = Query(100, ge=1, le=1000, description="返回记录数"),
     is_active: Optional[bool] = Query(None, description="是否激活（过滤条件）"),
+    cursor: Optional[str] = Query(
+        None, description="分页游标（上一页返回的 next_cursor，传入时忽略 skip）"
+    ),
+    include_total: bool = Query(True, description="是否返回总数"),
+    total_mode: Literal["exact", "cached", "estimated"] = Query(
+        "exact", description="总数计算方式：exact 精确 / cached 缓存计数 / estimated 统计估算"
+    ),
     user_service: UserService = Depends(get_user_service),
     current_user: User = Depends(get_current_user),
 ):
@@ -40,32 +78,177 @@ async def get_users(
     获取用户列表
     
     需要认证，支持分页和过滤
+    - OFFSET 分页：skip + limit（兼容旧客户端）
+    - 游标分页：cursor + limit（推荐，深分页性能与第一页相同）
+    - 总数：include_total=false 时不计算（total 为 null），total_mode 控制计算方式
+    - 条件请求：弱 ETag 由本页用户 ID、最大 updated_at、条数与总数生成，未变化时返回 304
+    """
+    users, total, next_cursor = await user_service.get_users(
+        skip=skip,
+        limit=limit,
+        is_active=is_active,
+        cursor=cursor,
+        include_total=include_total,
+        total_mode=total_mode,
+    )
+    # 直接传入 Pydantic 模型，整个响应体一次性序列化为 JSON 字节
+    return conditional_response(
+        request,
+        lambda: create_success_response(
+            data=UserListResponse(
+                items=users,
+                total=total,
+                skip=skip,
+                limit=limit,
+                next_cursor=next_cursor,
+            ),
+            message="获取用户列表成功",
+        ),
+        etag=make_etag(
+            len(users),
+            max((user.updated_at for user in users), default=None),
+            total,
+            next_cursor,
+            *(user.id for user in users),
+            weak=True,
+        ),
+    )
+
+
+@router.get("/search", status_code=200)
+async def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索词"),
+    limit: int = Query(20, ge=1, le=100, description="返回记录数"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）"),
+    user_service: UserService = Depends(get_user_service),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    搜索用户
+
+    需要认证。按 username / name 前缀匹配与全文检索（单词前缀、不区分大小写）搜索，
+    结果按相关度排序：username 前缀匹配（完全匹配最前）> name 前缀匹配 > 全文检索相关度；
+    使用 cursor + limit 分页。全文检索只返回相关度最高的前 SEARCH_FULLTEXT_CANDIDATES 条，
+    更多匹配被省略时最后一页的 truncated 为 true
     """
-    users, total = user_service.get_users(skip=skip, limit=limit, is_active=is_active)
-    # 将 Pydantic 模型列表转换为字典列表（使用 mode='json' 确保 datetime 正确序列化）
-    users_dict = [user.model_dump(mode='json') for user in users]
+    q = q.strip()
+    if not q:
+        items, next_cursor, truncated = [], None, False
+    else:
+        items, next_cursor, truncated = await user_service.search_users(
+            q, limit=limit, cursor=cursor
+        )
     return create_success_response(
-        data={"items": users_dict, "total": total, "skip": skip, "limit": limit},
-        message="获取用户列表成功",
+        data=UserSearchResponse(
+            items=items, limit=limit, next_cursor=next_cursor, truncated=truncated
+        ),
+        message="搜索用户成功",
+    )
+
+
+@router.get("/export", status_code=200)
+async def export_users(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="导出格式"),
+    is_active: Optional[bool] = Query(None, description="是否激活（过滤条件）"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    导出用户（流式）
+
+    需要认证。通过服务端游标分批读取并逐批编码输出，内存占用与用户数无关；
+    按创建时间升序输出，不包含密码哈希
+    """
+
+    async def content():
+        if format == "csv":
+            yield encode_csv_rows([EXPORT_COLUMNS])
+        async with user_service_scope() as user_service:
+            async for rows in user_service.export_users(
+                is_active=is_active, chunk_size=settings.EXPORT_CHUNK_SIZE
+            ):
+                if format == "csv":
+                    yield encode_csv_rows(rows)
+                else:
+                    yield encode_ndjson_rows(EXPORT_COLUMNS, rows)
+
+    return StreamingResponse(
+        content(),
+        media_type=CSV_MEDIA_TYPE if format == "csv" else NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
     )
 
 
+@router.post("/bulk", status_code=200)
+@no_compression
+async def bulk_import_users(
+    request: Request,
+    batch_size: int = Query(
+        settings.BULK_IMPORT_BATCH_SIZE, ge=1, le=5000, description="每批插入行数"
+    ),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    批量导入用户（流式）
+
+    需要认证。请求体为 NDJSON（Content-Type: application/x-ndjson）或
+    CSV（Content-Type: text/csv，第一行为表头），每行字段与创建用户相同。
+    响应为 NDJSON，逐行返回导入结果，最后一行为汇总：
+    - {"line": 2, "status": "created", "id": "...", "username": "..."}
+    - {"line": 3, "status": "failed", "username": "...", "error": "用户名已存在"}
+    - {"summary": {"total": 2, "created": 1, "failed": 1}}
+
+    结果逐行实时输出，不压缩（每行单独 flush 压缩收益很小）
+    """
+    stream_format = detect_stream_format(request.headers.get("content-type"))
+
+    async def results():
+        async with user_service_scope() as user_service:
+            records = iter_records(request.stream(), stream_format)
+            async for result in user_service.import_users(records, batch_size):
+                yield encode_ndjson(result)
+
+    return DuplexStreamingResponse(results(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post("/bulk-action", status_code=200)
+async def bulk_action_users(
+    data: UserBulkAction,
+    user_service: UserService = Depends(get_user_service),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    批量激活 / 禁用 / 删除用户
+
+    需要认证。ids 与 filter 二选一，由单条 UPDATE / DELETE 完成：
+    - {"action": "deactivate", "ids": ["...", "..."]}
+    - {"action": "delete", "filter": {"created_before": "2024-01-01T00:00:00", "is_active": false}}
+    返回实际受影响的用户数（激活 / 禁用时不计入状态本就相同的用户）
+    """
+    result = await user_service.bulk_action(data)
+    return create_success_response(data=result, message="批量操作用户成功")
+
+
 @router.get("/{user_id}", status_code=200)
 async def get_user(
     user_id: str,
+    request: Request,
     user_service: UserService = Depends(get_user_service),
     current_user: User = Depends(get_current_user),
 ):
     """
     根据 ID 获取用户信息
     
-    需要认证
+    需要认证，支持条件请求（If-None-Match / If-Modified-Since），未变化时返回 304
     """
-    user = user_service.get_user_by_id(user_id)
-    user_response = UserResponse.model_validate(user)
-    return create_success_response(
-        data=user_response.model_dump(mode='json'),
-        message="获取用户信息成功",
+    user = await user_service.get_user_by_id(user_id)
+    return conditional_response(
+        request,
+        lambda: create_success_response(
+            data=UserResponse.model_validate(user),
+            message="获取用户信息成功",
+        ),
+        etag=make_etag(user.id, user.updated_at),
+        last_modified=user.updated_at,
     )
 
 
@@ -80,9 +263,9 @@ async def create_user(
     
     需要认证
     """
-    user_response = user_service.create_user(user_data)
+    user_response = await user_service.create_user(user_data)
     return create_success_response(
-        data=user_response.model_dump(mode='json'),
+        data=user_response,
         message="创建用户成功",
         status_code=201,
     )
@@ -100,9 +283,9 @@ async def update_user(
     
     需要认证
     """
-    user_response = user_service.update_user(user_id, user_data)
+    user_response = await user_service.update_user(user_id, user_data)
     return create_success_response(
-        data=user_response.model_dump(mode='json'),
+        data=user_response,
         message="更新用户成功",
     )
 
@@ -118,7 +301,7 @@ async def delete_user(
     
     需要认证
     """
-    user_service.delete_user(user_id)
+    await user_service.delete_user(user_id)
     return create_success_response(data=None, message="删除用户成功")
 
 
@@ -133,8 +316,8 @@ async def toggle_user_active(
     
     需要认证
     """
-    user_response = user_service.toggle_user_active(user_id)
+    user_response = await user_service.toggle_user_active(user_id)
     return create_success_response(
-        data=user_response.model_dump(mode='json'),
+        data=user_response,
         message="切换用户激活状态成功",
     )
@@ -0,0 +1,160 @@
+"""进程内缓存"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    有界 TTL + LRU 缓存
+
+    - 超过 max_size 时淘汰最久未使用的条目
+    - 每个条目有过期时间（默认 ttl 秒，可在 set 时单独指定）
+    - 记录命中/未命中次数，便于观察命中率
+
+    注意：缓存仅在当前进程内有效，多 worker 部署时各进程独立
+    """
+
+    def __init__(self, max_size: int, ttl: float, name: str = "default"):
+        """
+        初始化缓存
+
+        Args:
+            max_size: 最大条目数
+            ttl: 默认过期时间（秒）
+            name: 缓存名称（用于指标标签）
+        """
+        self.name = name
+        self._hit_counter = CACHE_REQUESTS.labels(name, "hit")
+        self._miss_counter = CACHE_REQUESTS.labels(name, "miss")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> V | None:
+        """获取缓存值（不存在或已过期时返回 None）"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                self._miss_counter.inc()
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                self._miss_counter.inc()
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            self._hit_counter.inc()
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """
+        设置缓存值
+
+        Args:
+            key: 键
+            value: 值
+            ttl: 过期时间（秒），为 None 时使用默认 ttl
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """删除缓存条目"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """获取缓存统计信息"""
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+        }
+
+
+class CounterCache:
+    """
+    增量维护的计数缓存
+
+    首次读取时由调用方用精确计数初始化，之后通过 incr() 增量更新；
+    条目在 ttl 秒后过期并重新精确计数，用于修正多 worker 之间的偏差
+    """
+
+    def __init__(self, ttl: float):
+        """
+        初始化计数缓存
+
+        Args:
+            ttl: 条目过期时间（秒）
+        """
+        self.ttl = ttl
+        self._data: dict[Hashable, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> int | None:
+        """获取计数（不存在或已过期时返回 None）"""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, value: int) -> None:
+        """设置计数"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def incr(self, key: Hashable, delta: int = 1) -> None:
+        """增量更新计数（条目不存在时忽略，等待下次精确计数）"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data[key] = (entry[0], max(entry[1] + delta, 0))
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+
+# 已认证用户（principal）缓存：username -> 用户快照
+# 用户更新/禁用/删除提交后会立即失效对应条目
+principal_cache: TTLCache[str, Any] = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principal",
+)
+
+# 用户数量缓存：is_active 过滤条件（None / True / False）-> 数量
+user_count_cache = CounterCache(ttl=settings.USER_COUNT_CACHE_TTL_SECONDS)
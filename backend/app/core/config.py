@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,6 +16,19 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
 
+    # 生产模式服务配置（python run.py --prod，或 DEBUG=False 时启用）
+    WORKERS: int = 0  # worker 进程数，0 表示按可用 CPU 核数（考虑容器 CPU 配额）
+    SERVER_LOOP: Literal["auto", "uvloop", "asyncio"] = "auto"  # auto 优先使用 uvloop
+    SERVER_HTTP: Literal["auto", "httptools", "h11"] = "auto"  # auto 优先使用 httptools
+    SERVER_BACKLOG: int = 2048  # 监听队列长度
+    SERVER_KEEP_ALIVE: int = 5  # Keep-Alive 超时（秒）
+    SERVER_LIMIT_CONCURRENCY: int | None = None  # 单 worker 最大并发连接数，超出返回 503
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # SIGTERM 后等待处理中请求完成的最长时间（秒）
+    # worker 运行不足 SERVER_WORKER_MIN_UPTIME 秒即退出视为启动失败：按指数退避重启，
+    # 连续失败 SERVER_MAX_FAST_FAILURES 次后停止整个服务（如数据库地址错误）
+    SERVER_WORKER_MIN_UPTIME: float = 10
+    SERVER_MAX_FAST_FAILURES: int = 5
+
     # CORS 配置（支持字符串或列表）
     # 开发环境：可以使用 "*" 允许所有源（但会禁用 credentials）
     # 生产环境：必须明确指定允许的域名
@@ -22,14 +37,68 @@ class Settings(BaseSettings):
 
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./app.db"
+    # 异步驱动 URL（可选，默认根据 DATABASE_URL 推导：aiosqlite / asyncpg / aiomysql）
+    ASYNC_DATABASE_URL: str | None = None
+    # 只读副本（可选，逗号分隔）：查询发往副本，写入及写入之后的查询发往主库
+    DATABASE_REPLICA_URLS: str | list[str] = []
+
+    # SQLite 调优模式（边缘部署）：WAL + 只读连接池 + 单写连接
+    SQLITE_TUNED: bool = False
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射大小（字节），默认 256MB
+    SQLITE_CACHE_SIZE: int = -65536  # 页缓存，负数表示 KiB（默认 64MB）
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 数据库被锁定时的等待时间（多进程写入）
+    SQLITE_READ_POOL_SIZE: int = 4  # 只读连接数
 
     # JWT 配置
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_CACHE_MAX_SIZE: int = 10000  # 已验证令牌缓存条目数，0 表示禁用
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7  # 刷新令牌有效期，每次刷新轮换为新令牌
+    # 令牌撤销列表：各 worker 从数据库增量同步其他 worker 的撤销（登出）间隔，0 表示只在启动时加载
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 5
+
+    # 密码哈希进程池配置（bcrypt 为 CPU 密集型操作，需移出事件循环）
+    PASSWORD_HASH_WORKERS: int = 0  # 工作进程数，0 表示使用 CPU 核数
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64  # 最大待处理任务数，超出时返回 503
+
+    # 认证用户缓存配置（get_current_user 避免每次请求查询数据库）
+    # 缓存按进程独立：本进程内的更新会立即失效，其他 worker 最多延迟 TTL 秒
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000  # 0 表示禁用
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+
+    # 批量导入：每批插入行数（每批一次 executemany + 一次提交）
+    BULK_IMPORT_BATCH_SIZE: int = 500
+    # 流式导出：服务端游标每批读取行数
+    EXPORT_CHUNK_SIZE: int = 1000
+
+    # 响应压缩（按 Accept-Encoding 协商 zstd / gzip，zstd 需安装 zstandard）
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # 小于此大小（字节）的响应不压缩
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1~9，越大压缩率越高、CPU 开销越大
+    COMPRESSION_ZSTD_LEVEL: int = 3  # 1~22
+
+    # 用户搜索：全文检索最多对前 N 条匹配结果按相关度排序（常见词匹配大量用户时限制查询耗时）
+    SEARCH_FULLTEXT_CANDIDATES: int = 1000
+
+    # 用户数量缓存（GET /users?total_mode=cached），过期后重新精确计数
+    USER_COUNT_CACHE_TTL_SECONDS: int = 300
 
     # 日志配置
     LOG_LEVEL: str = "INFO"
+    # 请求日志采样率（0~1）：成功且不慢的请求按此概率记录，生产环境可设为 0.01
+    LOG_SAMPLE_RATE: float = 1.0
+    # 慢请求阈值（毫秒）：超过阈值的请求始终记录（warning 级别）
+    SLOW_REQUEST_THRESHOLD_MS: float = 1000
+    # SQL 查询统计：慢查询阈值（毫秒）与单请求查询次数上限（超出时告警，提示 N+1 问题）
+    SQL_SLOW_QUERY_THRESHOLD_MS: float = 200
+    SQL_MAX_QUERIES_PER_REQUEST: int = 20
+    # 日志写入队列：日志由后台线程批量写出，队列满时按策略处理
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_POLICY: Literal["drop", "block"] = "drop"  # drop 丢弃并计数 / block 阻塞等待
+    LOG_BATCH_SIZE: int = 256
+    LOG_FLUSH_INTERVAL_MS: int = 100
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -50,5 +119,13 @@ class Settings(BaseSettings):
             return origins if origins else ["*"]  # 空字符串时默认使用通配符
         return v if isinstance(v, list) else ["*"]
 
+    @field_validator("DATABASE_REPLICA_URLS", mode="before")
+    @classmethod
+    def parse_replica_urls(cls, v: str | list[str]) -> list[str]:
+        """解析 DATABASE_REPLICA_URLS，支持逗号分隔字符串或列表格式"""
+        if isinstance(v, str):
+            return [url.strip() for url in v.split(",") if url.strip()]
+        return v
+
 
 settings = Settings()
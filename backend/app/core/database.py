@@ -1,15 +1,89 @@
-from sqlalchemy import create_engine
+import random
+import time
+
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import (
+    DB_CONNECTION_HOLD,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_WAIT,
+)
+from app.core.query_stats import get_query_stats, instrument_engine
 
 # 数据库 URL（默认使用 SQLite，生产环境建议使用 PostgreSQL 或 MySQL）
 DATABASE_URL = getattr(settings, "DATABASE_URL", "sqlite:///./app.db")
 
+# 同步驱动 → 异步驱动映射（本地 aiosqlite，生产 asyncpg / aiomysql）
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    将同步数据库 URL 转换为异步驱动 URL
+
+    同步驱动（如 postgresql+psycopg2、mysql+pymysql）会替换为对应的异步驱动，
+    已经是异步驱动（如 postgresql+asyncpg）时保持不变
+
+    Args:
+        url: 数据库 URL
+
+    Returns:
+        使用异步驱动的数据库 URL
+    """
+    sa_url = make_url(url)
+    if sa_url.get_dialect().is_async:
+        return url
+    async_driver = ASYNC_DRIVERS.get(sa_url.get_backend_name())
+    if async_driver is None:
+        return url
+    return sa_url.set(drivername=async_driver).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(DATABASE_URL)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """记录连接获取等待时间的异步连接池"""
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start_time)
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    """是否为内存 SQLite（只能使用单连接池）"""
+    sa_url = make_url(url)
+    return sa_url.get_backend_name() == "sqlite" and sa_url.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
 # 创建数据库引擎
 # SQLite 需要特殊配置，其他数据库（PostgreSQL、MySQL）使用默认配置
 connect_args = {}
+async_connect_args = {}
 if "sqlite" in DATABASE_URL:
     connect_args = {"check_same_thread": False}
 elif "mysql" in DATABASE_URL:
@@ -18,7 +92,69 @@ elif "mysql" in DATABASE_URL:
         "charset": "utf8mb4",
         "connect_timeout": 10,
     }
+    async_connect_args = connect_args
 
+# SQLite 调优模式：WAL + 读连接池 + 单写连接（内存数据库不适用）
+SQLITE_TUNED = (
+    settings.SQLITE_TUNED
+    and make_url(DATABASE_URL).get_backend_name() == "sqlite"
+    and not _is_memory_sqlite(DATABASE_URL)
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, query_only: bool = False) -> None:
+    """
+    为新建的 SQLite 连接设置 PRAGMA
+
+    Args:
+        dbapi_connection: DBAPI 连接（sqlite3 或 aiosqlite 适配器）
+        query_only: 是否为只读连接
+    """
+    pragmas = [
+        "PRAGMA journal_mode=WAL",  # 读写互不阻塞
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",  # WAL 下 NORMAL 即可保证一致性
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if query_only:
+        pragmas.append("PRAGMA query_only=ON")
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in pragmas:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _setup_sqlite_writer(sync_engine: Engine) -> None:
+    """
+    写连接：设置 PRAGMA，并以 BEGIN IMMEDIATE 开启事务
+
+    事务开始即获取写锁，避免读事务升级为写事务时出现 SQLITE_BUSY
+    """
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection)
+        # 由下面的 begin 事件显式开启事务
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sync_engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _setup_sqlite_reader(sync_engine: Engine) -> None:
+    """只读连接：设置 PRAGMA 并禁止写入"""
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection, query_only=True)
+
+
+# 同步引擎：仅用于脚本（db_init、建表、迁移），请求处理使用异步引擎
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
@@ -27,13 +163,167 @@ engine = create_engine(
     pool_recycle=3600,    # 连接回收时间（秒）
 )
 
+# 异步引擎：请求处理中的所有数据库 I/O 都通过它让出事件循环
+# SQLite 调优模式下为唯一的写连接（pool_size=1），写操作在连接池上排队串行执行
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=async_connect_args,
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    **(
+        {}
+        if _is_memory_sqlite(ASYNC_DATABASE_URL)
+        else {"poolclass": InstrumentedAsyncQueuePool}
+    ),
+    **({"pool_size": 1, "max_overflow": 0} if SQLITE_TUNED else {}),
+)
+
+# 只读引擎（SQLite 调优模式）：读请求使用独立的连接池，不与写连接争用
+# 配置了只读副本时查询发往副本，不创建该连接池
+async_read_engine = (
+    create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+    if SQLITE_TUNED and not settings.DATABASE_REPLICA_URLS
+    else None
+)
+
+if SQLITE_TUNED:
+    event.listen(
+        engine, "connect", lambda dbapi_connection, record: _apply_sqlite_pragmas(dbapi_connection)
+    )
+    _setup_sqlite_writer(async_engine.sync_engine)
+    if async_read_engine is not None:
+        _setup_sqlite_reader(async_read_engine.sync_engine)
+
+# 只读副本引擎：配置了 DATABASE_REPLICA_URLS 时，查询分散到各副本（同步驱动自动映射为异步驱动）
+async_replica_engines = [
+    create_async_engine(
+        get_async_database_url(url),
+        connect_args=async_connect_args,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        poolclass=InstrumentedAsyncQueuePool,
+    )
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+# 查询使用的引擎：优先使用副本，其次 SQLite 只读连接池；为空时读写都使用主库
+async_read_engines: list[AsyncEngine] = async_replica_engines or (
+    [async_read_engine] if async_read_engine is not None else []
+)
+
+
+def _instrument_pool(async_engine: AsyncEngine) -> None:
+    """连接借出/归还时更新连接池指标，并统计连接占用时长（计入借出时所在的请求）"""
+
+    @event.listens_for(async_engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+        DB_POOL_OVERFLOW.set(getattr(async_engine.pool, "overflow", lambda: 0)())
+        connection_record.info["checkout"] = (time.perf_counter(), get_query_stats())
+
+    @event.listens_for(async_engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+        DB_POOL_OVERFLOW.set(getattr(async_engine.pool, "overflow", lambda: 0)())
+        checkout = connection_record.info.pop("checkout", None)
+        if checkout is None:
+            return
+        start_time, stats = checkout
+        held = time.perf_counter() - start_time
+        DB_CONNECTION_HOLD.observe(held)
+        if stats is not None:
+            stats.checkouts += 1
+            stats.hold_time += held
+
+
+# SQL 计时与慢查询日志、连接池指标
+instrument_engine(engine)
+for _async_engine in (async_engine, *async_read_engines):
+    instrument_engine(_async_engine.sync_engine)
+    _instrument_pool(_async_engine)
+
+
+_READ_ONLY_SQL_PREFIXES = ("SELECT", "WITH", "EXPLAIN")
+
+
+def _is_write_clause(clause) -> bool:
+    """是否为写语句（INSERT/UPDATE/DELETE 或非查询的原生 SQL）"""
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(_READ_ONLY_SQL_PREFIXES)
+    return False
+
+
+class RoutingSession(Session):
+    """
+    读写分离会话
+
+    配置了只读引擎（副本或 SQLite 只读连接池）时，查询使用只读引擎；
+    flush（INSERT/UPDATE/DELETE）及写入之后的所有操作使用主库，
+    保证同一会话（即同一请求）内读到自己的写入
+    """
+
+    use_primary = False
+    _read_bind: Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not async_read_engines:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self._flushing or _is_write_clause(clause):
+            self.use_primary = True
+        if self.use_primary:
+            return async_engine.sync_engine
+        # 同一会话固定使用一个副本，避免不同副本复制延迟不同导致读到的数据前后不一致
+        if self._read_bind is None:
+            self._read_bind = random.choice(async_read_engines).sync_engine
+        return self._read_bind
+
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步会话工厂
+# expire_on_commit=False：提交后仍可读取实体属性，避免在事件循环中隐式触发懒加载
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # 声明基类
 Base = declarative_base()
 
 
+def dispose_engines_after_fork() -> None:
+    """
+    fork 后在子进程中丢弃继承的连接池
+
+    close=False：不关闭从父进程继承的连接（仍属于父进程），子进程按需建立新连接
+    """
+    engine.dispose(close=False)
+    for _engine in (async_engine, *async_read_engines):
+        _engine.sync_engine.dispose(close=False)
+
+
+async def dispose_async_engines() -> None:
+    """关闭异步引擎的连接池（应用关闭时调用）"""
+    for _engine in (async_engine, *async_read_engines):
+        await _engine.dispose()
+
+
 def get_db():
     """获取数据库会话（依赖注入）"""
     db = SessionLocal()
@@ -41,3 +331,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """获取异步数据库会话（依赖注入）"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,19 +1,28 @@
 """依赖注入"""
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 
+from app.core.cache import principal_cache
 from app.core.exceptions import AuthenticationError
-from app.core.security import verify_token
-from app.core.unit_of_work import IUnitOfWork, get_unit_of_work
+from app.core.revocation import revocation_list
+from app.core.security import TOKEN_TYPE_ACCESS, verify_token
+from app.core.unit_of_work import AsyncUnitOfWork, IUnitOfWork, get_unit_of_work
 from app.models.user import User
 from app.services.auth_service import AuthService
 from app.services.user_service import UserService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# 请求级 Unit of Work：路由函数返回后立即提交并归还连接，
+# 而不是等响应发送完毕（scope="request" 时连接会在发送响应期间闲置）
+UnitOfWorkDep = Depends(get_unit_of_work, scope="function")
+
 
-def get_auth_service(uow: IUnitOfWork = Depends(get_unit_of_work)) -> AuthService:
+def get_auth_service(uow: IUnitOfWork = UnitOfWorkDep) -> AuthService:
     """
     获取认证服务
     
@@ -26,7 +35,7 @@ def get_auth_service(uow: IUnitOfWork = Depends(get_unit_of_work)) -> AuthServic
     return AuthService(uow)
 
 
-def get_user_service(uow: IUnitOfWork = Depends(get_unit_of_work)) -> UserService:
+def get_user_service(uow: IUnitOfWork = UnitOfWorkDep) -> UserService:
     """
     获取用户服务
     
@@ -39,15 +48,47 @@ def get_user_service(uow: IUnitOfWork = Depends(get_unit_of_work)) -> UserServic
     return UserService(uow)
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    uow: IUnitOfWork = Depends(get_unit_of_work),
+@asynccontextmanager
+async def user_service_scope() -> AsyncIterator[UserService]:
+    """
+    获取独立的用户服务（自带 Unit of Work）
+
+    用于流式响应：响应体在路由函数返回后才生成，不能使用请求级的 Unit of Work
+    """
+    async with AsyncUnitOfWork() as uow:
+        yield UserService(uow)
+
+
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    验证访问令牌并返回 payload（依赖注入）
+
+    拒绝刷新令牌与已撤销（登出）的令牌；撤销检查为进程内字典查找，不访问数据库
+
+    Raises:
+        AuthenticationError: 当令牌无效或已撤销时
+    """
+    payload = verify_token(token)
+    if payload is None or payload.get("type", TOKEN_TYPE_ACCESS) != TOKEN_TYPE_ACCESS:
+        raise AuthenticationError("无效的认证令牌")
+    if revocation_list.is_revoked(payload.get("jti")) or revocation_list.is_revoked(
+        payload.get("sid")
+    ):
+        raise AuthenticationError("认证令牌已失效")
+    return payload
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    uow: IUnitOfWork = UnitOfWorkDep,
 ) -> User:
     """
     获取当前用户（依赖注入）
+
+    优先从 principal 缓存读取，未命中时查询数据库并写入缓存
     
     Args:
-        token: JWT Token
+        payload: 访问令牌 payload（已验证、未撤销）
         uow: Unit of Work 实例（通过依赖注入获取）
     
     Returns:
@@ -56,16 +97,22 @@ def get_current_user(
     Raises:
         AuthenticationError: 当认证失败时
     """
-    payload = verify_token(token)
-    if payload is None:
-        raise AuthenticationError("无效的认证令牌")
-
     username: str = payload.get("sub")
     if username is None:
         raise AuthenticationError("无效的认证令牌")
 
+    user = principal_cache.get(username)
+    if user is not None:
+        return user
+
     try:
         user_service = UserService(uow)
-        return user_service.get_user_by_username(username)
+        user = await user_service.get_user_by_username(username)
     except Exception:
         raise AuthenticationError("用户不存在")
+    finally:
+        # 认证只需读取一次，立即归还连接，后续查询按需重新借出
+        await uow.release()
+
+    principal_cache.set(username, user.snapshot())
+    return user
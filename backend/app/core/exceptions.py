@@ -33,6 +33,7 @@ class BaseAPIException(HTTPException):
             status.HTTP_409_CONFLICT: "CONFLICT",
             status.HTTP_422_UNPROCESSABLE_ENTITY: "VALIDATION_ERROR",
             status.HTTP_500_INTERNAL_SERVER_ERROR: "INTERNAL_SERVER_ERROR",
+            status.HTTP_503_SERVICE_UNAVAILABLE: "SERVICE_UNAVAILABLE",
         }
         return code_map.get(status_code, "UNKNOWN_ERROR")
 
@@ -101,3 +102,20 @@ class ConflictError(BaseAPIException):
             status_code=status.HTTP_409_CONFLICT,
             error_code=error_code or "CONFLICT",
         )
+
+
+class ServiceUnavailableError(BaseAPIException):
+    """服务不可用错误（如资源繁忙、过载保护）"""
+
+    def __init__(
+        self,
+        detail: str = "服务暂时不可用",
+        error_code: str | None = None,
+        retry_after: int = 1,
+    ):
+        super().__init__(
+            detail=detail,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code=error_code or "SERVICE_UNAVAILABLE",
+        )
+        self.headers = {"Retry-After": str(retry_after)}
@@ -1,21 +1,240 @@
 """日志配置"""
 
+import atexit
 import logging
+import os
+import queue
 import sys
+import threading
+from typing import Any, Literal, TextIO
 
 import structlog
 
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
+
+class QueueLogWriter:
+    """
+    非阻塞批量日志写入器
+
+    日志记录只入队（不在事件循环中执行 I/O），由后台线程批量写入输出流。
+    队列有界，满时按策略处理：
+    - drop：丢弃新日志并计数（默认，日志收集端变慢时不影响请求延迟）
+    - block：阻塞等待队列空位（不丢日志）
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        stream: TextIO,
+        max_size: int = 10000,
+        policy: Literal["drop", "block"] = "drop",
+        batch_size: int = 256,
+        flush_interval: float = 0.1,
+    ):
+        """
+        初始化写入器
+
+        Args:
+            stream: 输出流（如 sys.stdout）
+            max_size: 队列最大长度
+            policy: 队列满时的处理策略（drop / block）
+            batch_size: 每批最多写入的日志条数
+            flush_interval: 空闲时等待新日志的最长时间（秒）
+        """
+        self.stream = stream
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        # 写出时持有，fork 前获取，保证子进程不会继承写到一半的输出流
+        self._write_lock = threading.Lock()
+        self._start_thread()
+
+    def _start_thread(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def before_fork(self) -> None:
+        """fork 前：等待当前批次写完"""
+        self._write_lock.acquire()
+
+    def after_fork_in_parent(self) -> None:
+        """fork 后（父进程）：继续写出"""
+        self._write_lock.release()
+
+    def after_fork_in_child(self) -> None:
+        """fork 后（子进程）：后台线程不会被继承，重建队列并重新启动线程"""
+        self._write_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._start_thread()
+
+    def write(self, message: str | bytes) -> None:
+        """写入一条日志（入队）"""
+        try:
+            if self.policy == "block":
+                self._queue.put(message)
+            else:
+                self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        """后台线程：批量取出日志并写入输出流"""
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            stop = item is self._STOP
+            if not stop:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: list[str | bytes]) -> None:
+        """写入一批日志"""
+        lines = [
+            line.decode("utf-8") if isinstance(line, bytes) else line for line in batch
+        ]
+        with self._write_lock:
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+                self.written += len(lines)
+            except Exception:
+                self.dropped += len(lines)
+
+    def stats(self) -> dict[str, Any]:
+        """获取写入器状态"""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "policy": self.policy,
+        }
+
+    def is_alive(self) -> bool:
+        """后台写入线程是否仍在运行（close() 之后为 False）"""
+        return self._thread.is_alive()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """停止后台线程并写出剩余日志"""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+
+class QueueLogger:
+    """
+    structlog 输出端：将渲染后的日志交给当前的 QueueLogWriter
+
+    每次写入时查找模块级写入器，而不是在创建时绑定：structlog 会缓存已使用过的
+    logger（cache_logger_on_first_use），重新调用 setup_logging() 后它们仍能写到当前写入器
+    """
+
+    def msg(self, message: str | bytes) -> None:
+        """写入日志"""
+        writer = _log_writer
+        if writer is not None:
+            writer.write(message)
+
+    log = debug = info = warn = warning = err = error = critical = exception = fatal = msg
+
+
+class QueueLoggerFactory:
+    """QueueLogger 工厂"""
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger()
+
+
+class QueueLogHandler(logging.Handler):
+    """标准库 logging 处理器：同样经由 QueueLogWriter 输出"""
+
+    def __init__(self, writer: QueueLogWriter):
+        super().__init__()
+        self._writer = writer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._writer.write(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+_log_writer: QueueLogWriter | None = None
+
+
+def get_log_writer() -> QueueLogWriter | None:
+    """获取当前日志写入器（用于查看队列长度、丢弃数量等）"""
+    return _log_writer
+
+
+def shutdown_logging() -> None:
+    """写出剩余日志并停止写入线程"""
+    if _log_writer is not None:
+        _log_writer.close()
+
 
 def setup_logging(log_level: str = "INFO") -> None:
-    """配置结构化日志"""
+    """
+    配置结构化日志
+
+    可以重复调用（如同一进程内多次 create_app()）：沿用仍在运行的写入器，
+    只在首次调用或写入器已关闭时创建新的写入器
+    """
+    global _log_writer
+    if _log_writer is None or not _log_writer.is_alive():
+        _log_writer = QueueLogWriter(
+            sys.stdout,
+            max_size=settings.LOG_QUEUE_SIZE,
+            policy=settings.LOG_QUEUE_POLICY,
+            batch_size=settings.LOG_BATCH_SIZE,
+            flush_interval=settings.LOG_FLUSH_INTERVAL_MS / 1000,
+        )
 
     # 配置标准库 logging
+    handler = QueueLogHandler(_log_writer)
+    handler.setFormatter(logging.Formatter("%(message)s"))
     logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
+        handlers=[handler],
         level=getattr(logging, log_level.upper()),
+        force=True,
     )
 
+    # 生产环境 JSON 输出：优先使用 orjson（更快，直接输出 UTF-8 字节）
+    if sys.stdout.isatty():
+        renderer = structlog.dev.ConsoleRenderer()  # 开发环境彩色输出
+    elif orjson is not None:
+        renderer = structlog.processors.JSONRenderer(serializer=orjson.dumps)
+    else:
+        renderer = structlog.processors.JSONRenderer()  # JSON 格式输出
+
     # 配置 structlog
     structlog.configure(
         processors=[
@@ -24,19 +243,44 @@ def setup_logging(log_level: str = "INFO") -> None:
             structlog.processors.StackInfoRenderer(),  # 堆栈信息
             structlog.processors.format_exc_info,  # 异常信息
             structlog.processors.TimeStamper(fmt="iso"),  # ISO 时间戳
-            structlog.processors.JSONRenderer()  # JSON 格式输出
-            if not sys.stdout.isatty()
-            else structlog.dev.ConsoleRenderer(),  # 开发环境彩色输出
+            renderer,
         ],
         wrapper_class=structlog.make_filtering_bound_logger(
             getattr(logging, log_level.upper())
         ),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=QueueLoggerFactory(),
         cache_logger_on_first_use=True,
     )
 
 
+atexit.register(shutdown_logging)
+
+
+def _before_fork() -> None:
+    if _log_writer is not None:
+        _log_writer.before_fork()
+
+
+def _after_fork_in_parent() -> None:
+    if _log_writer is not None:
+        _log_writer.after_fork_in_parent()
+
+
+def _after_fork_in_child() -> None:
+    if _log_writer is not None:
+        _log_writer.after_fork_in_child()
+
+
+# 多 worker 模式（预加载后 fork）下，子进程自动重建日志写入线程
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_after_fork_in_child,
+    )
+
+
 def get_logger(name: str) -> structlog.BoundLogger:
     """获取日志记录器"""
     return structlog.get_logger(name)
@@ -0,0 +1,102 @@
+"""Prometheus 指标"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# 多 worker 部署时设置 PROMETHEUS_MULTIPROC_DIR，各进程的指标写入共享目录，
+# /metrics 在任意 worker 上都会汇总所有进程的数据
+
+# HTTP 请求
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP 请求数",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP 请求耗时（秒）",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "正在处理的 HTTP 请求数",
+    multiprocess_mode="livesum",
+)
+
+# 数据库连接池
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "已借出的数据库连接数",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "连接池溢出连接数（超出 pool_size 的连接，负数表示空闲容量）",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "从连接池获取连接的等待时间（秒）",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_CONNECTION_HOLD = Histogram(
+    "db_connection_hold_seconds",
+    "数据库连接从借出到归还的占用时长（秒）",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+# 缓存
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "缓存查询次数",
+    ["cache", "result"],
+)
+
+# 密码哈希进程池
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "密码哈希/校验耗时（秒）",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "密码任务在进程池中的排队时间（秒）",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "因队列已满被拒绝（503）的密码任务数",
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    生成 Prometheus 文本格式指标
+
+    Returns:
+        (指标内容, Content-Type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """worker 进程退出后清理其 gauge 数据（仅多进程模式）"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,140 @@
+"""SQL 查询统计（按请求）"""
+
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """单个请求内的 SQL 查询统计"""
+
+    count: int = 0
+    total_time: float = 0.0
+    slow_count: int = 0
+    # 数据库连接占用（从连接池借出到归还）的次数与总时长
+    checkouts: int = 0
+    hold_time: float = 0.0
+
+    @property
+    def total_ms(self) -> float:
+        """查询总耗时（毫秒）"""
+        return self.total_time * 1000
+
+    @property
+    def hold_ms(self) -> float:
+        """连接占用总时长（毫秒）"""
+        return self.hold_time * 1000
+
+    @property
+    def too_many(self) -> bool:
+        """查询次数是否超过 SQL_MAX_QUERIES_PER_REQUEST（可能存在 N+1 查询）"""
+        return self.count > settings.SQL_MAX_QUERIES_PER_REQUEST
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> tuple[QueryStats, Token]:
+    """
+    开始统计当前请求的 SQL 查询
+
+    Returns:
+        (统计对象, 用于 reset_query_stats 的令牌)
+    """
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def reset_query_stats(token: Token) -> None:
+    """结束当前请求的 SQL 查询统计"""
+    _query_stats.reset(token)
+
+
+def get_query_stats() -> QueryStats | None:
+    """获取当前请求的 SQL 查询统计（不在请求上下文中时返回 None）"""
+    return _query_stats.get()
+
+
+def describe_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """
+    描述参数结构（只记录参数名和类型，不记录参数值，避免泄露敏感数据）
+
+    Example:
+        {"username": "admin"} -> {"username": "str"}
+        [{"id": 1}, {"id": 2}] (executemany) -> "2 x {'id': 'int'}"
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = describe_parameters(parameters[0]) if parameters else None
+        return f"{len(parameters)} x {first}"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    为引擎注册 SQL 计时事件
+
+    - 累计当前请求的查询次数和耗时（包括执行失败的语句）
+    - 超过 SQL_SLOW_QUERY_THRESHOLD_MS 的语句记录慢查询日志（含参数结构）
+
+    开始时间保存在语句的执行上下文上（而不是连接上），
+    执行失败时 after_cursor_execute 不会触发，也不会在连接上残留
+    """
+    slow_threshold = settings.SQL_SLOW_QUERY_THRESHOLD_MS / 1000
+
+    def _record(statement, parameters, executemany, elapsed: float) -> None:
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.total_time += elapsed
+
+        if elapsed >= slow_threshold:
+            if stats is not None:
+                stats.slow_count += 1
+            logger.warning(
+                "慢查询",
+                statement=statement,
+                parameters=describe_parameters(parameters, executemany),
+                executemany=executemany,
+                duration=f"{elapsed:.3f}s",
+            )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start_time = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_query_start_time", None)
+        if started_at is None:
+            return
+        context._query_start_time = None
+        _record(statement, parameters, executemany, time.perf_counter() - started_at)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        context = exception_context.execution_context
+        started_at = getattr(context, "_query_start_time", None)
+        if started_at is None:
+            return
+        context._query_start_time = None
+        _record(
+            exception_context.statement,
+            exception_context.parameters,
+            bool(getattr(context, "executemany", False)),
+            time.perf_counter() - started_at,
+        )
@@ -1,29 +1,66 @@
 """统一响应格式处理"""
 
-from typing import Any, TypeVar
-from fastapi import Response
-from fastapi.responses import JSONResponse
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+from pydantic import BaseModel
 
 from app.schemas.response import UnifiedResponse, SuccessResponse
 
 T = TypeVar("T")
 
 
+class PydanticJSONResponse(Response):
+    """已序列化为 JSON 字节的响应（跳过 json.dumps）"""
+
+    media_type = "application/json"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    边读取请求体边输出的流式响应（如流式导入）
+
+    StreamingResponse 会启动一个调用 receive() 监听客户端断开的任务，
+    与响应生成器读取请求体争用同一个 receive 通道，导致请求体消息被吞掉。
+    这里不启动监听任务：客户端断开时，读取请求体会抛出 ClientDisconnect 结束生成器。
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@lru_cache(maxsize=None)
+def _get_envelope_model(data_type: type[BaseModel]) -> type[UnifiedResponse]:
+    """获取（缓存的）参数化统一响应模型 UnifiedResponse[data_type]"""
+    return UnifiedResponse[data_type]
+
+
 def create_success_response(
     data: T,
     message: str | None = None,
     status_code: int = 200,
-) -> JSONResponse:
+) -> Response:
     """
     创建成功响应（统一格式）
     
+    data 为 Pydantic 模型时走快速路径：整个响应体通过 UnifiedResponse[T]
+    由 pydantic-core 一次性直接序列化为字节，不再经过 model_dump → dict → json.dumps，
+    输出与 JSONResponse 字节一致
+    
     Args:
-        data: 响应数据
+        data: 响应数据（Pydantic 模型或可 JSON 序列化的数据）
         message: 响应消息（可选）
         status_code: HTTP 状态码（默认 200）
     
     Returns:
-        JSONResponse: 统一格式的成功响应
+        Response: 统一格式的成功响应
     
     Example:
         ```python
@@ -34,6 +71,16 @@ def create_success_response(
         # 返回: {"code": 200, "message": "获取成功", "data": {...}}
         ```
     """
+    if isinstance(data, BaseModel):
+        envelope = _get_envelope_model(type(data))(
+            code=status_code,  # 使用 HTTP 状态码
+            message=message,
+            data=data,
+        )
+        return PydanticJSONResponse(
+            content=envelope.model_dump_json(), status_code=status_code
+        )
+
     return JSONResponse(
         status_code=status_code,
         content={
@@ -44,6 +91,92 @@ def create_success_response(
     )
 
 
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """
+    根据版本信息生成 ETag（如 ID + updated_at）
+
+    Args:
+        parts: 决定响应内容的版本信息
+        weak: 是否为弱 ETag（内容语义相同即可，不保证字节一致，如列表页）
+    """
+    digest = hashlib.blake2b(
+        "\x1f".join(str(part) for part in parts).encode("utf-8"), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 是否匹配（弱比较：忽略 W/ 前缀）"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(",")
+    )
+
+
+def _to_utc(value: datetime) -> datetime:
+    """转换为 UTC（数据库中的时间为不带时区的 UTC 时间）"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def conditional_response(
+    request: Request,
+    build: Callable[[], Response],
+    etag: str,
+    last_modified: datetime | None = None,
+) -> Response:
+    """
+    条件 GET：资源未变化时返回空的 304，否则调用 build() 生成完整响应
+
+    If-None-Match 优先于 If-Modified-Since（RFC 9110）；
+    响应附带 ETag、Last-Modified 与 Cache-Control: private, no-cache，
+    浏览器会缓存响应并在下次请求时自动携带验证头
+
+    Args:
+        request: 当前请求
+        build: 生成完整响应的函数（只在资源有变化时调用，跳过序列化）
+        etag: 当前资源的 ETag（见 make_etag）
+        last_modified: 最后修改时间
+
+    Example:
+        ```python
+        return conditional_response(
+            request,
+            lambda: create_success_response(data=UserResponse.model_validate(user)),
+            etag=make_etag(user.id, user.updated_at),
+            last_modified=user.updated_at,
+        )
+        ```
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        # HTTP 日期精度为秒
+        last_modified = _to_utc(last_modified).replace(microsecond=0)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    not_modified = False
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif last_modified is not None and if_modified_since:
+        try:
+            since = _to_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            since = None
+        not_modified = since is not None and last_modified <= since
+
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    response = build()
+    response.headers.update(headers)
+    return response
+
+
 def create_error_response(
     message: str,
     status_code: int = 400,
@@ -0,0 +1,84 @@
+"""令牌撤销列表（进程内）"""
+
+import heapq
+import threading
+import time
+from datetime import datetime
+
+
+class RevocationList:
+    """
+    已撤销令牌集合
+
+    - 以 jti / sid 为键、令牌过期时间（Unix 时间戳）为值的字典，is_revoked() 为一次字典查找
+    - 最小堆按过期时间排序，已过期的条目从堆顶依次淘汰（令牌过期后无需再记录）
+    - 数据持久化在 revoked_tokens 表中：启动时加载，运行期间按 synced_at 增量同步其他 worker 的撤销
+
+    注意：仅在当前进程内有效，多 worker 部署时各进程独立维护
+    """
+
+    def __init__(self):
+        self._expiry: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+        # 已同步到的数据库撤销时间（UTC），None 表示尚未加载
+        self.synced_at: datetime | None = None
+
+    def is_revoked(self, token_id: str | None) -> bool:
+        """令牌（jti / sid）是否已撤销"""
+        if token_id is None:
+            return False
+        expires_at = self._expiry.get(token_id)
+        return expires_at is not None and expires_at > time.time()
+
+    def add(self, token_id: str, expires_at: float) -> bool:
+        """
+        记录撤销
+
+        Args:
+            token_id: jti 或 sid
+            expires_at: 对应令牌的过期时间（Unix 时间戳），之后条目自动淘汰
+
+        Returns:
+            是否为新增条目（已存在或已过期时返回 False）
+        """
+        now = time.time()
+        if expires_at <= now:
+            return False
+        with self._lock:
+            if self._expiry.get(token_id, 0.0) >= expires_at:
+                return False
+            self._expiry[token_id] = expires_at
+            heapq.heappush(self._heap, (expires_at, token_id))
+            self._evict(now)
+        return True
+
+    def purge(self) -> int:
+        """淘汰已过期的条目，返回淘汰数量"""
+        with self._lock:
+            return self._evict(time.time())
+
+    def _evict(self, now: float) -> int:
+        """按过期时间从堆顶淘汰（调用方持有锁）"""
+        evicted = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, token_id = heapq.heappop(self._heap)
+            # 同一条目可能以更晚的过期时间重新加入，只删除与堆顶一致的记录
+            if self._expiry.get(token_id) == expires_at:
+                del self._expiry[token_id]
+                evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        """清空撤销列表"""
+        with self._lock:
+            self._expiry.clear()
+            self._heap.clear()
+            self.synced_at = None
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+# 全局撤销列表
+revocation_list = RevocationList()
@@ -1,33 +1,71 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
 from jose import JWTError, jwt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
+# 已验证令牌缓存：sha256(token) -> payload
+# 条目过期时间不超过令牌自身的 exp，命中时只需一次字典查找，无需重新验签
+token_cache: TTLCache[bytes, dict] = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    name="token",
+)
+
+
+TOKEN_TYPE_ACCESS = "access"
+TOKEN_TYPE_REFRESH = "refresh"
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """创建访问令牌"""
-    to_encode = data.copy()
+    """创建访问令牌（带唯一 jti，用于撤销）"""
+    to_encode = {"type": TOKEN_TYPE_ACCESS, **data}
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
 
 
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """创建刷新令牌（只能用于 POST /auth/refresh 换取新令牌）"""
+    if expires_delta is None:
+        expires_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return create_access_token({**data, "type": TOKEN_TYPE_REFRESH}, expires_delta)
+
+
 def verify_token(token: str) -> Optional[dict]:
-    """验证令牌"""
+    """验证令牌（优先使用已验证令牌缓存）"""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+
+    payload = token_cache.get(key)
+    if payload is not None:
+        if payload["exp"] > now:
+            return dict(payload)
+        token_cache.invalidate(key)
+        return None
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+
+    # 仅缓存带 exp 的令牌，缓存时间不超过令牌剩余有效期
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > now:
+        token_cache.set(key, payload, ttl=exp - now)
+    return dict(payload)
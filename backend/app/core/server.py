@@ -0,0 +1,267 @@
+"""
+生产模式服务进程管理
+
+父进程预加载应用并监听端口，然后 fork 出多个 worker 共享同一个 socket，
+每个 worker 运行一个 uvicorn.Server：
+- 预加载：应用只在父进程导入、构建一次，worker 启动快且共享只读内存
+- fork 后：worker 丢弃继承的数据库连接池，日志写入线程自动重建
+- SIGTERM / SIGINT：通知所有 worker 停止接收新连接并处理完当前请求，
+  超过 SERVER_GRACEFUL_TIMEOUT 仍未退出的 worker 会被强制结束
+- worker 异常退出时自动重启；启动即失败的 worker 按指数退避重启，
+  连续失败 SERVER_MAX_FAST_FAILURES 次后停止服务
+"""
+
+import math
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.logging import get_logger, shutdown_logging
+
+logger = get_logger(__name__)
+
+
+def available_cpus() -> int:
+    """获取可用 CPU 核数（考虑 CPU 亲和性与 cgroup v2 配额）"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    # 容器限制 CPU 配额时（如 docker --cpus=2），cpu.max 为 "200000 100000"
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+def resolve_workers(workers: int) -> int:
+    """解析 worker 数（0 表示按可用 CPU 核数）"""
+    return workers if workers > 0 else available_cpus()
+
+
+def _uvicorn_kwargs() -> dict:
+    """根据 Settings 生成 uvicorn 配置参数"""
+    return {
+        "host": settings.HOST,
+        "port": settings.PORT,
+        "loop": settings.SERVER_LOOP,
+        "http": settings.SERVER_HTTP,
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEP_ALIVE,
+        "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+        # 请求日志由 LoggingMiddleware 记录，uvicorn 日志交给根 logger（结构化日志）
+        "access_log": False,
+        "log_config": None,
+    }
+
+
+def build_config(app: FastAPI) -> uvicorn.Config:
+    """创建 uvicorn 配置"""
+    return uvicorn.Config(app, **_uvicorn_kwargs())
+
+
+def _after_fork(workers: int) -> None:
+    """worker 进程初始化"""
+    from app.core.database import dispose_engines_after_fork
+    from app.utils.password import password_hasher
+
+    dispose_engines_after_fork()
+
+    # 密码进程池未显式配置时，按 worker 数平分 CPU，避免 worker 数 × 核数个进程
+    if settings.PASSWORD_HASH_WORKERS == 0:
+        password_hasher.max_workers = max(1, available_cpus() // workers)
+
+
+class WorkerSupervisor:
+    """预加载 + fork 多 worker 进程管理"""
+
+    def __init__(self, app: FastAPI, workers: int):
+        """
+        初始化
+
+        Args:
+            app: 已构建的应用（在父进程中预加载）
+            workers: worker 进程数
+        """
+        self.app = app
+        self.workers = workers
+        # worker pid -> 启动时间（monotonic）
+        self.children: dict[int, float] = {}
+        self.should_exit = False
+        self.sock = None
+        # 连续的快速失败次数与待重启 worker 的计划时间（monotonic）
+        self.fast_failures = 0
+        self.pending_respawns: list[float] = []
+        self.exit_code = 0
+
+    def run(self) -> int:
+        """
+        启动 worker 并监控，直到收到退出信号
+
+        Returns:
+            退出码：正常停止为 0，worker 连续启动失败为 1
+        """
+        self.sock = build_config(self.app).bind_socket()
+
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+
+        logger.info(
+            "启动 worker 进程",
+            pid=os.getpid(),
+            workers=self.workers,
+            address=f"{settings.HOST}:{settings.PORT}",
+        )
+        for _ in range(self.workers):
+            self._spawn()
+
+        while not self.should_exit:
+            self._reap(respawn=True)
+            self._respawn_due()
+            time.sleep(0.5)
+
+        self._shutdown()
+        return self.exit_code
+
+    def _handle_exit(self, signum, frame) -> None:
+        self.should_exit = True
+
+    def _spawn(self) -> None:
+        """fork 一个 worker"""
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return
+
+        # worker 进程
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            _after_fork(self.workers)
+            uvicorn.Server(build_config(self.app)).run(sockets=[self.sock])
+        except BaseException:
+            logger.exception("worker 异常退出", pid=os.getpid())
+            exit_code = 1
+        finally:
+            shutdown_logging()
+            os._exit(exit_code)
+
+    def _reap(self, respawn: bool) -> None:
+        """回收已退出的 worker"""
+        from app.core.metrics import mark_process_dead
+
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            started_at = self.children.pop(pid, None)
+            mark_process_dead(pid)
+            if respawn and not self.should_exit:
+                uptime = time.monotonic() - started_at if started_at is not None else None
+                self._schedule_respawn(pid, os.waitstatus_to_exitcode(status), uptime)
+
+    def _schedule_respawn(self, pid: int, exit_code: int, uptime: float | None) -> None:
+        """
+        安排重启退出的 worker
+
+        运行不足 SERVER_WORKER_MIN_UPTIME 秒即退出视为快速失败（通常是启动失败），
+        按 0.5s、1s、2s……（最长 30s）退避重启，连续失败次数达到上限时停止服务
+        """
+        if exit_code != 0:
+            logger.warning("worker 异常退出，重新启动", pid=pid, exit_code=exit_code)
+        else:
+            logger.info("worker 已退出，重新启动", pid=pid)
+
+        if uptime is not None and uptime >= settings.SERVER_WORKER_MIN_UPTIME:
+            self.fast_failures = 0
+            self.pending_respawns.append(time.monotonic())
+            return
+
+        self.fast_failures += 1
+        if self.fast_failures >= settings.SERVER_MAX_FAST_FAILURES:
+            logger.error(
+                "worker 连续启动失败，停止服务",
+                failures=self.fast_failures,
+                exit_code=exit_code,
+            )
+            self.exit_code = 1
+            self.should_exit = True
+            return
+        delay = min(0.5 * 2 ** (self.fast_failures - 1), 30.0)
+        self.pending_respawns.append(time.monotonic() + delay)
+
+    def _respawn_due(self) -> None:
+        """重启已到计划时间的 worker"""
+        now = time.monotonic()
+        due = [at for at in self.pending_respawns if at <= now]
+        if not due:
+            return
+        self.pending_respawns = [at for at in self.pending_respawns if at > now]
+        for _ in due:
+            self._spawn()
+
+    def _shutdown(self) -> None:
+        """通知 worker 优雅退出，超时后强制结束"""
+        logger.info("正在停止 worker 进程", workers=len(self.children))
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+
+        deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT + 5
+        while self.children and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.1)
+
+        for pid in list(self.children):
+            logger.warning("worker 未在超时时间内退出，强制结束", pid=pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.children.clear()
+        self.sock.close()
+
+
+def run_production(workers: int | None = None) -> None:
+    """
+    以生产模式启动服务
+
+    Args:
+        workers: worker 进程数（None 使用 Settings.WORKERS，0 表示按可用 CPU 核数）
+    """
+    workers = resolve_workers(settings.WORKERS if workers is None else workers)
+
+    if not hasattr(os, "fork"):
+        # 不支持 fork 的平台（Windows）：由 uvicorn 以 spawn 方式启动多进程
+        uvicorn.run("app.main:create_app", factory=True, workers=workers, **_uvicorn_kwargs())
+        return
+
+    # 预加载：在 fork 前导入并构建应用
+    from app.main import create_app
+
+    app = create_app()
+    if workers == 1:
+        uvicorn.Server(build_config(app)).run()
+        return
+    if WorkerSupervisor(app, workers).run() != 0:
+        sys.exit(1)
+
@@ -0,0 +1,42 @@
+"""
+启动耗时统计
+
+记录从导入 app.main 开始到各启动阶段完成的耗时，用于观察冷启动与滚动发布时间。
+命令行查看：python -m app.core.startup
+"""
+
+import time
+
+_started = time.perf_counter()
+_phases: dict[str, float] = {}
+
+
+def mark_phase(phase: str) -> float:
+    """
+    记录启动阶段完成时间
+
+    Args:
+        phase: 阶段名称（如 import、create_app、startup）
+
+    Returns:
+        自开始导入以来的耗时（毫秒）
+    """
+    elapsed = round((time.perf_counter() - _started) * 1000, 2)
+    _phases[phase] = elapsed
+    return elapsed
+
+
+def get_startup_report() -> dict[str, float]:
+    """获取各阶段耗时（毫秒，自开始导入起累计）"""
+    return dict(_phases)
+
+
+if __name__ == "__main__":
+    # 以 -m 运行时本模块为 __main__，耗时记录在 app.core.startup 模块中
+    from app.core import startup
+    from app.main import create_app
+
+    create_app()
+    for name, elapsed in startup.get_startup_report().items():
+        print(f"{name:<12}{elapsed:>10.2f} ms")
+    print("\n模块级导入耗时明细：python -X importtime -c 'import app.main' 2> importtime.log")
@@ -1,9 +1,10 @@
 """Unit of Work Pattern - 工作单元模式"""
 
-from typing import Protocol
-from sqlalchemy.orm import Session
+from typing import AsyncGenerator, Protocol
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal
+from app.repositories.revoked_token_repository import RevokedTokenRepository
 from app.repositories.user_repository import UserRepository
 
 
@@ -11,28 +12,48 @@ class IUnitOfWork(Protocol):
     """Unit of Work 接口"""
 
     users: UserRepository
+    revoked_tokens: RevokedTokenRepository
 
-    def commit(self) -> None:
+    async def commit(self) -> None:
         """提交事务"""
         ...
 
-    def rollback(self) -> None:
+    async def rollback(self) -> None:
         """回滚事务"""
         ...
 
+    def use_primary(self) -> None:
+        """后续操作全部使用主库"""
+        ...
+
+    async def release(self) -> None:
+        """结束当前事务并归还数据库连接"""
+        ...
 
-class UnitOfWork:
-    """Unit of Work 实现 - 管理工作单元和事务"""
 
-    def __init__(self, session: Session | None = None):
+class AsyncUnitOfWork:
+    """Unit of Work 实现 - 基于 AsyncSession 管理工作单元和事务"""
+
+    def __init__(self, session: AsyncSession | None = None):
         """
         初始化 Unit of Work
-        
+
+        会话在首次使用时才创建，连接在第一条 SQL 执行时才从连接池借出；
+        没有访问数据库的请求（如命中 principal 缓存）不会占用连接
+
         Args:
-            session: 数据库会话（如果为 None，则创建新会话）
+            session: 异步数据库会话（如果为 None，则在首次使用时创建新会话）
         """
-        self.session: Session = session or SessionLocal()
+        self._session: AsyncSession | None = session
         self._users: UserRepository | None = None
+        self._revoked_tokens: RevokedTokenRepository | None = None
+
+    @property
+    def session(self) -> AsyncSession:
+        """获取会话（首次访问时创建）"""
+        if self._session is None:
+            self._session = AsyncSessionLocal()
+        return self._session
 
     @property
     def users(self) -> UserRepository:
@@ -41,42 +62,81 @@ class UnitOfWork:
             self._users = UserRepository(self.session)
         return self._users
 
-    def commit(self) -> None:
-        """提交事务"""
+    @property
+    def revoked_tokens(self) -> RevokedTokenRepository:
+        """获取已撤销令牌 Repository"""
+        if self._revoked_tokens is None:
+            self._revoked_tokens = RevokedTokenRepository(self.session)
+        return self._revoked_tokens
+
+    async def commit(self) -> None:
+        """
+        提交事务
+
+        没有进行中的事务（如服务层已经提交过）时不做任何操作，
+        因此服务层显式提交后，请求结束时的自动提交不会再产生一次数据库往返
+        """
+        if self._session is None or not self._session.in_transaction():
+            return
         try:
-            self.session.commit()
+            await self.session.commit()
         except Exception:
-            self.session.rollback()
+            await self.session.rollback()
             raise
 
-    def rollback(self) -> None:
+    async def rollback(self) -> None:
         """回滚事务"""
-        self.session.rollback()
+        if self._session is not None:
+            await self._session.rollback()
+
+    def use_primary(self) -> None:
+        """
+        后续操作全部使用主库
+
+        配置了只读副本时，查询默认发往副本，flush 之后自动切换到主库。
+        写操作在读取校验数据（如用户名是否存在）之前调用，避免基于副本的延迟数据做判断。
+        """
+        self.session.sync_session.use_primary = True
+
+    async def release(self) -> None:
+        """
+        结束当前事务并归还数据库连接
+
+        读取完成后、执行耗时的非数据库操作（如密码校验、序列化）之前调用，
+        避免连接在这段时间内闲置占用。会话仍可继续使用，下次查询重新借出连接
+        """
+        await self.commit()
 
-    def close(self) -> None:
+    async def close(self) -> None:
         """关闭会话"""
-        self.session.close()
+        if self._session is not None:
+            await self._session.close()
 
+    async def __aenter__(self) -> "AsyncUnitOfWork":
+        return self
 
-from typing import Generator
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """退出时关闭会话（未提交的修改会被回滚）"""
+        await self.close()
 
 
-def get_unit_of_work() -> Generator[IUnitOfWork, None, None]:
+async def get_unit_of_work() -> AsyncGenerator[IUnitOfWork, None]:
     """
     获取 Unit of Work（用于依赖注入）
     
     注意：FastAPI 的依赖注入会自动管理生命周期
-    在请求结束时，自动调用 commit() 或 rollback()
+    在路由函数返回后（发送响应之前，依赖声明为 scope="function"），
+    自动调用 commit() 或 rollback() 并归还连接
     
     Yields:
         IUnitOfWork: Unit of Work 实例
     """
-    uow = UnitOfWork()
+    uow = AsyncUnitOfWork()
     try:
         yield uow
-        uow.commit()
+        await uow.commit()
     except Exception:
-        uow.rollback()
+        await uow.rollback()
         raise
     finally:
-        uow.close()
+        await uow.close()
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""数据库初始化脚本"""
+"""数据库初始化脚本：执行迁移并写入初始数据"""
 
 import sys
 from pathlib import Path
@@ -8,17 +8,47 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.core.database import Base, engine
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal, engine
 from app.models import User
 from app.utils.password import get_password_hash
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+
+ALEMBIC_INI = project_root / "alembic.ini"
+
+
+def get_alembic_config() -> Config:
+    """获取 Alembic 配置"""
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def run_migrations() -> None:
+    """
+    将数据库迁移到最新版本
+
+    兼容旧版本在启动时通过 create_all 建表的数据库：
+    存在 users 表但没有 alembic_version 时，先标记为对应的版本再升级。
+    """
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        inspector = inspect(connection)
+        if inspector.has_table("users") and not inspector.has_table("alembic_version"):
+            indexes = {index["name"] for index in inspector.get_indexes("users")}
+            baseline = "0002" if "ix_users_created_at_id" in indexes else "0001"
+            command.stamp(config, baseline)
+        command.upgrade(config, "head")
 
 
 def init_db():
     """初始化数据库"""
-    # 创建所有表
-    Base.metadata.create_all(bind=engine)
+    # 执行迁移
+    run_migrations()
 
     # 创建默认管理员用户（如果不存在）
     db: Session = SessionLocal()
@@ -1,10 +1,16 @@
-from fastapi import FastAPI
+from app.core.startup import get_startup_report, mark_phase
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.config import settings
-from app.core.database import Base, engine
+from app.core.database import dispose_async_engines
 from app.core.exception_handlers import (
     base_api_exception_handler,
     general_exception_handler,
@@ -13,66 +19,154 @@ from app.core.exception_handlers import (
 )
 from app.core.exceptions import BaseAPIException
 from app.core.logging import get_logger, setup_logging
+from app.core.metrics import render_metrics
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.utils.password import password_hasher
 
-# 初始化日志
-setup_logging(log_level=settings.LOG_LEVEL)
 logger = get_logger(__name__)
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
-
-# 添加中间件
-app.add_middleware(LoggingMiddleware)
-
-# CORS 配置
-# 注意：如果使用通配符 ["*"]，allow_credentials 必须为 False
-# 开发环境使用通配符方便测试，生产环境必须明确指定域名
-cors_origins = settings.CORS_ORIGINS
-allow_credentials = True
-
-# 如果使用通配符，禁用 credentials（开发环境）
-# JWT Token 通过 Authorization header 传递，不依赖 credentials，所以可以安全禁用
-if cors_origins == ["*"]:
-    allow_credentials = False
-    if settings.DEBUG:
-        logger.info("CORS: 使用通配符模式，allow_credentials 已自动禁用（开发环境）")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_origins,
-    allow_credentials=allow_credentials,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# 注册异常处理器
-app.add_exception_handler(BaseAPIException, base_api_exception_handler)
-app.add_exception_handler(RequestValidationError, validation_exception_handler)
-app.add_exception_handler(StarletteHTTPException, http_exception_handler)
-app.add_exception_handler(Exception, general_exception_handler)
-
-
-@app.get("/")
-async def root():
-    """根路径"""
-    return {"message": "Welcome to FastAPI Backend", "version": settings.APP_VERSION}
-
-
-@app.get("/health")
-async def health_check():
-    """健康检查"""
-    return {"status": "ok"}
-
-
-# 导入路由
-from app.api.v1.router import api_router
-
-app.include_router(api_router, prefix="/api/v1")
+mark_phase("import")
+
+# 数据库中已过期撤销记录的清理间隔（秒）
+REVOCATION_PURGE_INTERVAL_SECONDS = 3600
+
+
+async def sync_revocations(purge: bool = False) -> None:
+    """从数据库同步令牌撤销列表（失败时记录日志，下次同步重试）"""
+    from app.core.unit_of_work import AsyncUnitOfWork
+    from app.services.auth_service import AuthService
+
+    try:
+        async with AsyncUnitOfWork() as uow:
+            count = await AuthService(uow).sync_revocations(purge=purge)
+        if count:
+            logger.info("同步令牌撤销列表", count=count)
+    except Exception as e:
+        logger.warning("同步令牌撤销列表失败", error=str(e))
+
+
+async def _revocation_sync_loop(interval: float) -> None:
+    """定期同步其他 worker 的撤销（登出），并定期清理数据库中已过期的记录"""
+    last_purge = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        purge = time.monotonic() - last_purge >= REVOCATION_PURGE_INTERVAL_SECONDS
+        if purge:
+            last_purge = time.monotonic()
+        await sync_revocations(purge=purge)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    应用生命周期
+
+    数据库表结构由 Alembic 迁移管理（python -m app.db_init 或 alembic upgrade head），
+    启动时不再建表，避免每次启动、热重载都访问数据库。
+    """
+    # 加载令牌撤销列表（已登出的令牌在重启后仍然无效）
+    await sync_revocations(purge=True)
+    sync_task = None
+    if settings.REVOCATION_SYNC_INTERVAL_SECONDS > 0:
+        sync_task = asyncio.create_task(
+            _revocation_sync_loop(settings.REVOCATION_SYNC_INTERVAL_SECONDS)
+        )
+
+    mark_phase("startup")
+    logger.info("应用启动完成", **{f"{k}_ms": v for k, v in get_startup_report().items()})
+    yield
+    if sync_task is not None:
+        sync_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await sync_task
+    # 关闭密码哈希进程池
+    password_hasher.shutdown()
+    # 关闭数据库连接池
+    await dispose_async_engines()
+
+
+def create_app() -> FastAPI:
+    """创建 FastAPI 应用"""
+    # 初始化日志
+    setup_logging(log_level=settings.LOG_LEVEL)
+
+    app = FastAPI(
+        title=settings.APP_NAME,
+        version=settings.APP_VERSION,
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan,
+    )
+
+    # 添加中间件
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+
+    # CORS 配置
+    # 注意：如果使用通配符 ["*"]，allow_credentials 必须为 False
+    # 开发环境使用通配符方便测试，生产环境必须明确指定域名
+    cors_origins = settings.CORS_ORIGINS
+    allow_credentials = True
+
+    # 如果使用通配符，禁用 credentials（开发环境）
+    # JWT Token 通过 Authorization header 传递，不依赖 credentials，所以可以安全禁用
+    if cors_origins == ["*"]:
+        allow_credentials = False
+        if settings.DEBUG:
+            logger.info("CORS: 使用通配符模式，allow_credentials 已自动禁用（开发环境）")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=cors_origins,
+        allow_credentials=allow_credentials,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # 注册异常处理器
+    app.add_exception_handler(BaseAPIException, base_api_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    app.add_exception_handler(Exception, general_exception_handler)
+
+    @app.get("/")
+    async def root():
+        """根路径"""
+        return {"message": "Welcome to FastAPI Backend", "version": settings.APP_VERSION}
+
+    @app.get("/health")
+    async def health_check():
+        """健康检查（附带密码进程池队列深度与等待时间）"""
+        return {"status": "ok", "password_hasher": password_hasher.stats()}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus 指标"""
+        content, content_type = render_metrics()
+        return Response(content=content, media_type=content_type)
+
+    # 导入路由
+    from app.api.v1.router import api_router
+
+    app.include_router(api_router, prefix="/api/v1")
+
+    mark_phase("create_app")
+    return app
+
+
+def __getattr__(name: str):
+    """
+    延迟创建模块级 app（兼容 uvicorn app.main:app）
+
+    仅导入 app.main（如脚本、迁移、测试）时不会构建应用；
+    也可以使用工厂模式启动：uvicorn app.main:create_app --factory
+    """
+    if name == "app":
+        application = create_app()
+        globals()["app"] = application
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
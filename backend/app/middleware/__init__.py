@@ -1,3 +1,5 @@
+from app.middleware.compression import CompressionMiddleware, no_compression
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.metrics import MetricsMiddleware
 
-__all__ = ["LoggingMiddleware"]
+__all__ = ["CompressionMiddleware", "LoggingMiddleware", "MetricsMiddleware", "no_compression"]
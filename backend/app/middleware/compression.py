@@ -0,0 +1,246 @@
+"""响应压缩中间件（gzip / zstd）"""
+
+import gzip
+import zlib
+from typing import Callable, TypeVar
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard 为可选依赖
+    zstandard = None
+
+F = TypeVar("F", bound=Callable)
+
+# 可压缩的内容类型（另外所有 text/* 与 +json / +xml 均可压缩）
+COMPRESSIBLE_MEDIA_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def no_compression(endpoint: F) -> F:
+    """
+    路由级关闭响应压缩
+
+    Example:
+        ```python
+        @router.post("/bulk")
+        @no_compression
+        async def bulk_import_users(...):
+            ...
+        ```
+    """
+    endpoint.__no_compression__ = True
+    return endpoint
+
+
+def _is_compressible(content_type: str) -> bool:
+    """内容类型是否值得压缩（图片、压缩包等已压缩格式不再压缩）"""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_MEDIA_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    根据 Accept-Encoding 选择压缩算法
+
+    支持 q 值（q=0 表示拒绝）与通配符 *；权重相同时优先 zstd（已安装 zstandard 时），其次 gzip
+
+    Returns:
+        "zstd" / "gzip"，客户端不支持压缩时返回 None
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip()] = q
+
+    available = ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _StreamCompressor:
+    """流式压缩器：每个分块压缩后立即 flush，保证流式响应及时送达客户端"""
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            # wbits=31：gzip 格式（带 gzip 头和校验）
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._flush_mode = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes) -> bytes:
+        """压缩一个分块"""
+        return self._compressor.compress(data) + self._compressor.flush(self._flush_mode)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """压缩最后一个分块并结束压缩流"""
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件（纯 ASGI 实现）
+
+    - 按 Accept-Encoding 协商 zstd / gzip（zstd 需安装 zstandard）
+    - 一次性响应小于 minimum_size 字节时不压缩，避免在小响应上浪费 CPU
+    - 流式响应（StreamingResponse）逐块压缩并 flush，不缓冲整个响应体
+    - 以下响应不压缩：已设置 Content-Encoding、不可压缩的内容类型、
+      Cache-Control: no-transform、路由使用了 @no_compression
+    - 压缩后强 ETag 转为弱 ETag（字节内容已变化，条件请求仍可匹配）
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int | None = None,
+        gzip_level: int | None = None,
+        zstd_level: int | None = None,
+    ):
+        """
+        初始化中间件
+
+        Args:
+            app: ASGI 应用
+            minimum_size: 最小压缩大小（字节，默认读取 COMPRESSION_MINIMUM_SIZE）
+            gzip_level: gzip 压缩级别（1~9，默认读取 COMPRESSION_GZIP_LEVEL）
+            zstd_level: zstd 压缩级别（1~22，默认读取 COMPRESSION_ZSTD_LEVEL）
+        """
+        self.app = app
+        self.minimum_size = (
+            settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        )
+        self.levels = {
+            "gzip": settings.COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level,
+            "zstd": settings.COMPRESSION_ZSTD_LEVEL if zstd_level is None else zstd_level,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """处理请求，按需压缩响应"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Message | None = None
+        compressor: _StreamCompressor | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                # 等到第一个响应体分块再决定是否压缩
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is None:
+                # 已经开始输出响应体
+                if passthrough:
+                    await send(message)
+                elif more_body:
+                    await send({**message, "body": compressor.compress(body)})
+                else:
+                    await send({**message, "body": compressor.finish(body)})
+                return
+
+            headers = MutableHeaders(scope=start_message)
+            if not self._should_compress(scope, start_message, headers):
+                passthrough = True
+            else:
+                # 响应内容随 Accept-Encoding 变化（包括未压缩的情况），通知缓存按其区分
+                headers.add_vary_header("Accept-Encoding")
+                content_length = headers.get("content-length")
+                if encoding is None:
+                    passthrough = True
+                elif more_body:
+                    passthrough = (
+                        content_length is not None and int(content_length) < self.minimum_size
+                    )
+                else:
+                    passthrough = len(body) < self.minimum_size
+
+            if passthrough:
+                await send(start_message)
+                start_message = None
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+
+            if more_body:
+                # 流式响应：长度未知，使用分块传输
+                del headers["Content-Length"]
+                compressor = _StreamCompressor(encoding, self.levels[encoding])
+                data = compressor.compress(body)
+            else:
+                data = self._compress(encoding, body)
+                headers["Content-Length"] = str(len(data))
+
+            await send(start_message)
+            start_message = None
+            await send({**message, "body": data})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _should_compress(scope: Scope, message: Message, headers: MutableHeaders) -> bool:
+        """响应是否可以压缩"""
+        if message["status"] in (204, 304) or scope["method"] == "HEAD":
+            return False
+        if "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        if not _is_compressible(headers.get("content-type", "")):
+            return False
+        endpoint = getattr(scope.get("route"), "endpoint", None)
+        return not getattr(endpoint, "__no_compression__", False)
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        """一次性压缩完整响应体"""
+        level = self.levels[encoding]
+        if encoding == "zstd":
+            return zstandard.ZstdCompressor(level=level).compress(body)
+        return gzip.compress(body, compresslevel=level, mtime=0)
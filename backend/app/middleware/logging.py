@@ -1,56 +1,129 @@
 """请求日志中间件"""
 
+import random
 import time
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.query_stats import reset_query_stats, start_query_stats
 
 logger = get_logger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """请求日志中间件"""
+class LoggingMiddleware:
+    """
+    请求日志中间件（纯 ASGI 实现）
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """处理请求并记录日志"""
-        start_time = time.time()
-
-        # 记录请求信息
-        logger.info(
-            "请求开始",
-            method=request.method,
-            path=request.url.path,
-            client_host=request.client.host if request.client else None,
+    相比 BaseHTTPMiddleware，不会为每个请求额外创建任务和内存流，也不会破坏流式响应。
+
+    日志采样策略：
+    - 失败请求（状态码 >= 400 或抛出异常）：始终记录
+    - 慢请求（耗时 >= slow_request_threshold_ms）：始终记录
+    - SQL 查询次数超过 SQL_MAX_QUERIES_PER_REQUEST 的请求：始终记录
+    - 其他请求：按 sample_rate 概率记录
+
+    每条请求日志附带 SQL 查询次数与耗时、数据库连接占用时长，并写入 Server-Timing 响应头
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float | None = None,
+        slow_request_threshold_ms: float | None = None,
+    ):
+        """
+        初始化中间件
+
+        Args:
+            app: ASGI 应用
+            sample_rate: 正常请求的日志采样率（0~1，默认读取 LOG_SAMPLE_RATE）
+            slow_request_threshold_ms: 慢请求阈值（毫秒，默认读取 SLOW_REQUEST_THRESHOLD_MS）
+        """
+        self.app = app
+        self.sample_rate = (
+            settings.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
         )
+        self.slow_request_threshold = (
+            settings.SLOW_REQUEST_THRESHOLD_MS
+            if slow_request_threshold_ms is None
+            else slow_request_threshold_ms
+        ) / 1000
 
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-
-            # 记录响应信息
-            logger.info(
-                "请求完成",
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                process_time=f"{process_time:.3f}s",
-            )
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """处理请求并记录日志"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-            # 添加处理时间到响应头
-            response.headers["X-Process-Time"] = str(process_time)
-            return response
+        start_time = time.perf_counter()
+        status_code = 500
+        query_stats, token = start_query_stats()
 
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                # 添加处理时间、SQL 耗时到响应头
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(process_time))
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={query_stats.total_ms:.2f};desc="{query_stats.count} queries", '
+                    f"db-hold;dur={query_stats.hold_ms:.2f}, "
+                    f"app;dur={process_time * 1000:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            process_time = time.time() - start_time
+            process_time = time.perf_counter() - start_time
             logger.error(
                 "请求失败",
-                method=request.method,
-                path=request.url.path,
+                method=scope["method"],
+                path=scope["path"],
+                client_host=scope["client"][0] if scope.get("client") else None,
                 error=str(e),
                 process_time=f"{process_time:.3f}s",
+                db_queries=query_stats.count,
+                db_time=f"{query_stats.total_time:.3f}s",
+                db_hold_time=f"{query_stats.hold_time:.3f}s",
                 exc_info=True,
             )
             raise
+        finally:
+            reset_query_stats(token)
+
+        process_time = time.perf_counter() - start_time
+        is_slow = process_time >= self.slow_request_threshold
+        if (
+            status_code < 400
+            and not is_slow
+            and not query_stats.too_many
+            and random.random() >= self.sample_rate
+        ):
+            return
+
+        # 记录响应信息
+        if query_stats.too_many:
+            event = "查询次数过多"
+        elif is_slow:
+            event = "慢请求"
+        else:
+            event = "请求完成"
+        log = logger.warning if is_slow or query_stats.too_many else logger.info
+        log(
+            event,
+            method=scope["method"],
+            path=scope["path"],
+            client_host=scope["client"][0] if scope.get("client") else None,
+            status_code=status_code,
+            process_time=f"{process_time:.3f}s",
+            db_queries=query_stats.count,
+            db_time=f"{query_stats.total_time:.3f}s",
+            db_hold_time=f"{query_stats.hold_time:.3f}s",
+        )
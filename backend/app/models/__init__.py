@@ -1,3 +1,4 @@
 from app.models.user import User
+from app.models.revoked_token import RevokedToken
 
-__all__ = ["User"]
+__all__ = ["User", "RevokedToken"]
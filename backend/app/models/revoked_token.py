@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Index
+
+from app.core.database import Base
+
+
+class RevokedToken(Base):
+    """已撤销令牌模型（jti 或会话 ID sid）"""
+
+    # 撤销类型
+    KIND_ACCESS = "access"  # 访问令牌 jti
+    KIND_SESSION = "session"  # 登录会话 sid（登出）
+    KIND_REFRESH = "refresh"  # 已轮换的刷新令牌 jti，只用于数据库主键去重，不加载到内存
+
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        # 清理已过期条目：DELETE ... WHERE expires_at <= now
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+        # 多 worker 增量同步：WHERE revoked_at > 上次同步时间
+        Index("ix_revoked_tokens_revoked_at", "revoked_at"),
+    )
+
+    id = Column(String(64), primary_key=True)
+    kind = Column(String(16), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean
+from sqlalchemy import Column, String, DateTime, Boolean, Index
 import uuid
 
 from app.core.database import Base
@@ -9,6 +9,14 @@ class User(Base):
     """用户模型"""
 
     __tablename__ = "users"
+    __table_args__ = (
+        # 列表排序与游标分页：ORDER BY created_at DESC, id DESC
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # 搜索：name 前缀匹配，ORDER BY name, id
+        Index("ix_users_name_id", "name", "id"),
+        # 全文索引（SQLite FTS5 表 users_fts、映射表 users_fts_docs 及触发器、
+        # PostgreSQL GIN、MySQL FULLTEXT）依赖具体数据库，只在迁移 0003 / 0005 中创建
+    )
 
     id = Column(
         String(36),
@@ -25,3 +33,13 @@ class User(Base):
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+
+    def snapshot(self) -> "User":
+        """
+        创建脱离会话的只读副本
+
+        用于跨请求缓存，避免共享绑定到某个会话的实体
+        """
+        return User(
+            **{column.key: getattr(self, column.key) for column in self.__table__.columns}
+        )
@@ -1,4 +1,5 @@
 from app.repositories.base_repository import BaseRepository
+from app.repositories.revoked_token_repository import RevokedTokenRepository
 from app.repositories.user_repository import UserRepository
 
-__all__ = ["BaseRepository", "UserRepository"]
+__all__ = ["BaseRepository", "RevokedTokenRepository", "UserRepository"]
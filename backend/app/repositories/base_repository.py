@@ -2,8 +2,8 @@
 
 from abc import ABC, abstractmethod
 from typing import Generic, TypeVar, Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
 
 from app.core.database import Base
 
@@ -11,47 +11,50 @@ ModelType = TypeVar("ModelType", bound=Base)
 
 
 class BaseRepository(ABC, Generic[ModelType]):
-    """Repository 基类"""
+    """Repository 基类（基于 AsyncSession）"""
 
-    def __init__(self, db: Session, model: type[ModelType]):
+    def __init__(self, db: AsyncSession, model: type[ModelType]):
         """
         初始化 Repository
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             model: SQLAlchemy 模型类
         """
         self.db = db
         self.model = model
 
-    def get_by_id(self, id: str) -> Optional[ModelType]:
+    async def get_by_id(self, id: str) -> Optional[ModelType]:
         """根据 ID 获取实体"""
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        return await self.db.scalar(
+            select(self.model).where(self.model.id == id).limit(1)
+        )
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         """获取所有实体"""
-        return self.db.query(self.model).offset(skip).limit(limit).all()
+        result = await self.db.scalars(select(self.model).offset(skip).limit(limit))
+        return list(result.all())
 
-    def create(self, obj: ModelType) -> ModelType:
+    async def create(self, obj: ModelType) -> ModelType:
         """创建实体"""
         self.db.add(obj)
-        self.db.flush()
+        await self.db.flush()
         return obj
 
-    def update(self, obj: ModelType) -> ModelType:
+    async def update(self, obj: ModelType) -> ModelType:
         """更新实体"""
-        self.db.flush()
+        await self.db.flush()
         return obj
 
-    def delete(self, obj: ModelType) -> None:
+    async def delete(self, obj: ModelType) -> None:
         """删除实体"""
-        self.db.delete(obj)
-        self.db.flush()
+        await self.db.delete(obj)
+        await self.db.flush()
 
-    def count(self) -> int:
+    async def count(self) -> int:
         """获取实体数量"""
-        return self.db.query(self.model).count()
+        return await self.db.scalar(select(func.count()).select_from(self.model))
 
-    def exists(self, id: str) -> bool:
+    async def exists(self, id: str) -> bool:
         """检查实体是否存在"""
-        return self.db.query(self.model).filter(self.model.id == id).first() is not None
+        return await self.get_by_id(id) is not None
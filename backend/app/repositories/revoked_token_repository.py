@@ -0,0 +1,75 @@
+"""已撤销令牌 Repository"""
+
+from datetime import datetime
+from typing import Optional, Sequence
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, insert, select
+
+from app.core.exceptions import ConflictError
+from app.models.revoked_token import RevokedToken
+from app.repositories.base_repository import BaseRepository
+
+
+class RevokedTokenRepository(BaseRepository[RevokedToken]):
+    """已撤销令牌 Repository"""
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, RevokedToken)
+
+    async def add(self, token_id: str, kind: str, expires_at: datetime) -> None:
+        """
+        撤销令牌（单条 INSERT，由主键保证同一令牌只能撤销一次）
+
+        Args:
+            token_id: jti 或 sid
+            kind: 撤销类型（RevokedToken.KIND_*）
+            expires_at: 对应令牌的过期时间（UTC）
+
+        Raises:
+            ConflictError: 令牌已被撤销（如刷新令牌被重复使用）
+        """
+        try:
+            await self.db.execute(
+                insert(RevokedToken).values(
+                    id=token_id,
+                    kind=kind,
+                    expires_at=expires_at,
+                    revoked_at=datetime.utcnow(),
+                )
+            )
+        except IntegrityError as e:
+            raise ConflictError("令牌已被撤销") from e
+
+    async def get_active(
+        self,
+        now: datetime,
+        kinds: Sequence[str],
+        revoked_after: Optional[datetime] = None,
+    ) -> Sequence[Row]:
+        """
+        获取未过期的撤销条目
+
+        Args:
+            now: 当前时间（UTC）
+            kinds: 撤销类型（RevokedToken.KIND_*）
+            revoked_after: 只返回此时间之后撤销的条目（增量同步），None 表示全部
+
+        Returns:
+            (id, expires_at) 行列表
+        """
+        stmt = select(RevokedToken.id, RevokedToken.expires_at).where(
+            RevokedToken.expires_at > now, RevokedToken.kind.in_(kinds)
+        )
+        if revoked_after is not None:
+            stmt = stmt.where(RevokedToken.revoked_at > revoked_after)
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    async def delete_expired(self, now: datetime) -> int:
+        """删除已过期的撤销条目（令牌本身已过期，无需再记录），返回删除行数"""
+        result = await self.db.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= now)
+        )
+        return result.rowcount
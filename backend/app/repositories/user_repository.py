@@ -1,59 +1,550 @@
 """用户 Repository"""
 
-from typing import Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import (
+    ColumnElement,
+    and_,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    not_,
+    or_,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects import mysql
+
+from app.core.config import settings
+from app.core.exceptions import ConflictError
 
 from app.models.user import User
 from app.repositories.base_repository import BaseRepository
 
+# 搜索结果的排名层级（依次输出，层级之间去重）
+SEARCH_TIER_USERNAME = 0  # username 前缀匹配（完全匹配排在最前），按 username 排序
+SEARCH_TIER_NAME = 1  # name 前缀匹配，按 (name, id) 排序
+SEARCH_TIER_FULLTEXT = 2  # 全文检索（词前缀匹配，不区分大小写），按相关度排序
+# 各层级分页游标中排序键的长度：[username]、[name, id]、[score, id]
+SEARCH_TIER_KEY_LENGTHS = {SEARCH_TIER_USERNAME: 1, SEARCH_TIER_NAME: 2, SEARCH_TIER_FULLTEXT: 2}
+
+# SQLite FTS5 无内容表及文档 ID 映射（迁移 0005 创建，由触发器与 users 表同步）
+users_fts = table("users_fts", column("rowid"), column("rank"))
+users_fts_docs = table("users_fts_docs", column("doc_id"), column("user_id"))
+
 
 class UserRepository(BaseRepository[User]):
     """用户 Repository"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         super().__init__(db, User)
 
-    def get_by_username(self, username: str) -> Optional[User]:
+    async def get_by_username(self, username: str) -> Optional[User]:
         """根据用户名获取用户"""
-        return self.db.query(User).filter(User.username == username).first()
+        return await self.db.scalar(
+            select(User).where(User.username == username).limit(1)
+        )
 
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def get_by_email(self, email: str) -> Optional[User]:
         """根据邮箱获取用户（如果模型有 email 字段）"""
         # 如果 User 模型有 email 字段，可以这样实现
-        # return self.db.query(User).filter(User.email == email).first()
+        # return await self.db.scalar(select(User).where(User.email == email))
         return None
 
-    def is_username_exists(self, username: str) -> bool:
+    async def is_username_exists(self, username: str) -> bool:
         """检查用户名是否存在"""
         return (
-            self.db.query(User).filter(User.username == username).first() is not None
+            await self.db.scalar(
+                select(User.id).where(User.username == username).limit(1)
+            )
+            is not None
         )
 
-    def get_active_users(self, skip: int = 0, limit: int = 100) -> list[User]:
-        """获取活跃用户列表"""
+    async def create(self, obj: User) -> User:
+        """
+        创建用户（单条 INSERT，由唯一索引保证用户名不重复）
+
+        Raises:
+            ConflictError: 用户名已存在
+        """
+        try:
+            return await super().create(obj)
+        except IntegrityError as e:
+            raise ConflictError("用户名已存在") from e
+
+    async def update_by_id(self, user_id: str, **values: Any) -> Optional[User]:
+        """
+        按 ID 更新用户并返回更新后的用户（UPDATE ... RETURNING，单次往返）
+
+        不支持 RETURNING 的数据库（如 MySQL）回退为 UPDATE + SELECT
+
+        Args:
+            user_id: 用户 ID
+            values: 列值（可以是 SQL 表达式）
+
+        Returns:
+            更新后的用户，不存在时返回 None
+        """
+        stmt = update(User).where(User.id == user_id).values(**values)
+        options = {"synchronize_session": False, "populate_existing": True}
+        if self.db.get_bind().dialect.update_returning:
+            return await self.db.scalar(stmt.returning(User), execution_options=options)
+
+        result = await self.db.execute(stmt, execution_options=options)
+        if result.rowcount == 0:
+            return None
+        return await self.db.scalar(
+            select(User).where(User.id == user_id).execution_options(populate_existing=True)
+        )
+
+    async def toggle_active(self, user_id: str) -> Optional[User]:
+        """切换激活状态（is_active = NOT is_active），返回更新后的用户"""
+        return await self.update_by_id(user_id, is_active=not_(User.is_active))
+
+    async def delete_by_id(self, user_id: str) -> Optional[tuple[str, bool]]:
+        """
+        按 ID 删除用户（DELETE ... RETURNING，单次往返）
+
+        不支持 RETURNING 的数据库回退为 SELECT + DELETE
+
+        Returns:
+            被删除用户的 (username, is_active)，不存在时返回 None
+        """
+        stmt = delete(User).where(User.id == user_id)
+        options = {"synchronize_session": False}
+        if self.db.get_bind().dialect.delete_returning:
+            result = await self.db.execute(
+                stmt.returning(User.username, User.is_active), execution_options=options
+            )
+            row = result.first()
+        else:
+            result = await self.db.execute(
+                select(User.username, User.is_active).where(User.id == user_id)
+            )
+            row = result.first()
+            if row is not None:
+                await self.db.execute(stmt, execution_options=options)
+        return tuple(row) if row is not None else None
+
+    async def get_existing_usernames(self, usernames: Iterable[str]) -> set[str]:
+        """批量检查用户名，返回其中已存在的用户名（单次 IN 查询）"""
+        usernames = list(usernames)
+        if not usernames:
+            return set()
+        result = await self.db.scalars(
+            select(User.username).where(User.username.in_(usernames))
+        )
+        return set(result.all())
+
+    async def bulk_create(self, rows: list[dict[str, Any]]) -> None:
+        """
+        批量插入用户（executemany，不创建 ORM 对象）
+
+        Args:
+            rows: 列字典列表（id、created_at 等未提供的列使用模型默认值）
+
+        Raises:
+            ConflictError: 违反唯一约束（用户名已存在）
+        """
+        if not rows:
+            return
+        try:
+            await self.db.execute(insert(User), rows)
+        except IntegrityError as e:
+            raise ConflictError("用户名已存在") from e
+
+    @staticmethod
+    def _bulk_conditions(
+        ids: Optional[Sequence[str]] = None,
+        created_before: Optional[datetime] = None,
+        created_after: Optional[datetime] = None,
+        is_active: Optional[bool] = None,
+    ) -> list[ColumnElement[bool]]:
+        """构造批量操作的 WHERE 条件（AND）"""
+        conditions = []
+        if ids is not None:
+            conditions.append(User.id.in_(ids))
+        if created_before is not None:
+            conditions.append(User.created_at < created_before)
+        if created_after is not None:
+            conditions.append(User.created_at > created_after)
+        if is_active is not None:
+            conditions.append(User.is_active == is_active)
+        return conditions
+
+    async def bulk_set_active(
+        self,
+        active: bool,
+        ids: Optional[Sequence[str]] = None,
+        created_before: Optional[datetime] = None,
+        created_after: Optional[datetime] = None,
+        is_active: Optional[bool] = None,
+    ) -> int:
+        """
+        批量设置激活状态（单条 UPDATE，跳过状态已相同的行）
+
+        Returns:
+            实际被修改的行数
+        """
+        conditions = self._bulk_conditions(ids, created_before, created_after, is_active)
+        result = await self.db.execute(
+            update(User)
+            .where(User.is_active != active, *conditions)
+            .values(is_active=active)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def bulk_delete(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        created_before: Optional[datetime] = None,
+        created_after: Optional[datetime] = None,
+        is_active: Optional[bool] = None,
+    ) -> int:
+        """
+        批量删除（单条 DELETE）
+
+        Returns:
+            被删除的行数
+        """
+        conditions = self._bulk_conditions(ids, created_before, created_after, is_active)
+        result = await self.db.execute(
+            delete(User)
+            .where(*conditions)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def search(
+        self,
+        q: str,
+        limit: int,
+        after: Optional[tuple[int, list[Any]]] = None,
+    ) -> tuple[list[tuple[User, tuple[int, list[Any]]]], bool]:
+        """
+        搜索用户（username / name 前缀匹配 + 全文检索）
+
+        按层级依次查询（见 SEARCH_TIER_*），每层都由索引支撑并使用键集分页，
+        前一层数量不足 limit 时才查询下一层，已在前面层级出现的用户不再重复返回
+
+        Args:
+            q: 搜索词
+            limit: 返回记录数
+            after: 游标位置 (层级, 层级内排序键)，只返回排在其后的记录
+
+        Returns:
+            ([(用户, (层级, 排序键))], 是否截断)：排序键用于生成下一页游标；
+            全文检索结果已取完、但匹配数超过 SEARCH_FULLTEXT_CANDIDATES 时截断为 True
+        """
+        start_tier, after_key = after if after is not None else (SEARCH_TIER_USERNAME, None)
+        results: list[tuple[User, tuple[int, list[Any]]]] = []
+        truncated = False
+        for tier in (SEARCH_TIER_USERNAME, SEARCH_TIER_NAME, SEARCH_TIER_FULLTEXT):
+            if tier < start_tier or len(results) >= limit:
+                continue
+            key = after_key if tier == start_tier else None
+            requested = limit - len(results)
+            rows = await self._search_tier(tier, q, requested, key)
+            results.extend((user, (tier, user_key)) for user, user_key in rows)
+            if tier == SEARCH_TIER_FULLTEXT and len(rows) < requested:
+                truncated = await self._fulltext_truncated(q)
+        return results, truncated
+
+    @staticmethod
+    def _prefix_condition(column, prefix: str) -> ColumnElement[bool]:
+        """前缀匹配条件：范围条件走 B-tree 索引，LIKE 保证结果精确"""
+        conditions = [column >= prefix, column.startswith(prefix, autoescape=True)]
+        # 上界：最后一个字符替换为其后继（跳过代理区；已是最大码位时没有上界）
+        successor = ord(prefix[-1]) + 1
+        if 0xD800 <= successor <= 0xDFFF:
+            successor = 0xE000
+        if successor <= 0x10FFFF:
+            conditions.append(column < prefix[:-1] + chr(successor))
+        return and_(*conditions)
+
+    async def _search_tier(
+        self, tier: int, q: str, limit: int, after: Optional[list[Any]]
+    ) -> list[tuple[User, list[Any]]]:
+        """查询单个层级，返回 [(用户, 排序键)]"""
+        username_prefix = self._prefix_condition(User.username, q)
+
+        if tier == SEARCH_TIER_USERNAME:
+            stmt = select(User).where(username_prefix).order_by(User.username)
+            if after is not None:
+                stmt = stmt.where(User.username > after[0])
+            users = (await self.db.scalars(stmt.limit(limit))).all()
+            return [(user, [user.username]) for user in users]
+
+        name_prefix = self._prefix_condition(User.name, q)
+        if tier == SEARCH_TIER_NAME:
+            stmt = (
+                select(User)
+                .where(name_prefix, not_(username_prefix))
+                .order_by(User.name, User.id)
+            )
+            if after is not None:
+                after_name, after_id = after
+                stmt = stmt.where(
+                    or_(User.name > after_name, and_(User.name == after_name, User.id > after_id))
+                )
+            users = (await self.db.scalars(stmt.limit(limit))).all()
+            return [(user, [user.name, user.id]) for user in users]
+
+        candidates = self._fulltext_candidates(q)
+        if candidates is None:
+            return []
+        # score 越小越相关
+        score = candidates.c.score
+        stmt = (
+            select(User, score)
+            .join(candidates, candidates.c.key == User.id)
+            .order_by(score, User.id)
+        )
+        if after is not None:
+            after_score, after_id = after
+            stmt = stmt.where(
+                or_(score > after_score, and_(score == after_score, User.id > after_id))
+            )
+        result = await self.db.execute(stmt.limit(limit))
+        return [(user, [user_score, user.id]) for user, user_score in result.all()]
+
+    def _fulltext_match(self, q: str):
+        """
+        构造全文检索匹配查询（依赖迁移 0003 / 0005 创建的全文索引，未排序、未限制行数）
+
+        搜索词按单词拆分，每个词做前缀匹配，多个词之间为 AND；
+        已由前缀匹配层级返回的用户不在其中
+
+        Returns:
+            查询 (key, score)：key 为 users.id，score 越小越相关；
+            搜索词中没有可检索的单词时返回 None
+        """
+        words = re.findall(r"\w+", q)
+        if not words:
+            return None
+        dialect = self.db.get_bind().dialect.name
+        not_prefix = (
+            not_(self._prefix_condition(User.username, q)),
+            not_(self._prefix_condition(User.name, q)),
+        )
+
+        if dialect == "sqlite":
+            # FTS5 rank 列为 bm25 得分，越小越相关；文档 ID 通过映射表转换为用户 ID
+            match = " ".join(f'"{word}"*' for word in words)
+            return (
+                select(User.id.label("key"), users_fts.c.rank.label("score"))
+                .select_from(users_fts)
+                .join(users_fts_docs, users_fts_docs.c.doc_id == users_fts.c.rowid)
+                .join(User, User.id == users_fts_docs.c.user_id)
+                .where(literal_column("users_fts").op("MATCH")(match), *not_prefix)
+            )
+        if dialect == "postgresql":
+            # 与 GIN 表达式索引一致：to_tsvector('simple', username || ' ' || name)
+            vector = func.to_tsvector(
+                literal_column("'simple'"),
+                User.username.op("||")(literal_column("' '")).op("||")(User.name),
+            )
+            query = func.to_tsquery(
+                literal_column("'simple'"), " & ".join(f"{word}:*" for word in words)
+            )
+            return select(
+                User.id.label("key"), (-func.ts_rank(vector, query)).label("score")
+            ).where(vector.op("@@")(query), *not_prefix)
+        if dialect == "mysql":
+            # ngram 全文索引本身支持子串匹配
+            against = " ".join(f'+"{word}"' for word in words)
+            match = mysql.match(User.username, User.name, against=against).in_boolean_mode()
+            return select(User.id.label("key"), (-match).label("score")).where(
+                match > 0, *not_prefix
+            )
+        return None
+
+    def _fulltext_candidates(self, q: str):
+        """
+        构造全文检索候选集子查询：相关度最高的前 SEARCH_FULLTEXT_CANDIDATES 条匹配
+
+        常见词匹配大量用户时，分页查询只在有限的候选集内进行
+
+        Returns:
+            子查询 (key, score)；没有可检索的单词时返回 None
+        """
+        match = self._fulltext_match(q)
+        if match is None:
+            return None
+        columns = match.selected_columns
         return (
-            self.db.query(User)
-            .filter(User.is_active == True)
+            match.order_by(columns.score, columns.key)
+            .limit(settings.SEARCH_FULLTEXT_CANDIDATES)
+            .subquery("candidates")
+        )
+
+    async def _fulltext_truncated(self, q: str) -> bool:
+        """全文检索匹配数是否超过候选集上限（超出部分不会返回）"""
+        match = self._fulltext_match(q)
+        if match is None:
+            return False
+        limit = settings.SEARCH_FULLTEXT_CANDIDATES
+        keys = match.with_only_columns(match.selected_columns.key).limit(limit + 1)
+        count = await self.db.scalar(select(func.count()).select_from(keys.subquery()))
+        return count > limit
+
+    async def stream_rows(
+        self,
+        columns: Sequence[str],
+        is_active: Optional[bool] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        以服务端游标分批读取用户列（不创建 ORM 对象）
+
+        Args:
+            columns: 列名
+            is_active: 是否激活（过滤条件）
+            chunk_size: 每批行数
+
+        Yields:
+            每批行（元组）
+        """
+        stmt = select(*(getattr(User, column) for column in columns)).order_by(
+            User.created_at, User.id
+        )
+        if is_active is not None:
+            stmt = stmt.where(User.is_active == is_active)
+
+        result = await self.db.stream(stmt.execution_options(yield_per=chunk_size))
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+
+    async def get_active_users(self, skip: int = 0, limit: int = 100) -> list[User]:
+        """获取活跃用户列表"""
+        result = await self.db.scalars(
+            select(User)
+            .where(User.is_active == True)
             .offset(skip)
             .limit(limit)
-            .all()
         )
+        return list(result.all())
 
-    def get_all(
-        self, skip: int = 0, limit: int = 100, is_active: Optional[bool] = None
-    ) -> tuple[list[User], int]:
-        """获取用户列表（支持分页和过滤）"""
-        query = self.db.query(User)
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        is_active: Optional[bool] = None,
+        after: Optional[tuple[datetime, str]] = None,
+        include_total: bool = True,
+    ) -> tuple[list[User], Optional[int]]:
+        """
+        获取用户列表（支持分页和过滤）
+
+        按 (created_at, id) 倒序排列，由 ix_users_created_at_id 索引支撑
+
+        Args:
+            skip: 跳过记录数（OFFSET 分页）
+            limit: 返回记录数
+            is_active: 是否激活（过滤条件）
+            after: 游标位置 (created_at, id)，只返回排在其后的记录（游标分页）
+            include_total: 是否精确计数（COUNT 在大表上是全表扫描），为 False 时总数为 None
+        """
+        query = select(User)
 
         # 根据 is_active 过滤
         if is_active is not None:
-            query = query.filter(User.is_active == is_active)
+            query = query.where(User.is_active == is_active)
 
         # 获取总数
-        total = query.count()
+        total = await self.count_users(is_active) if include_total else None
+
+        # 游标分页：(created_at, id) < (after_created_at, after_id)
+        if after is not None:
+            after_created_at, after_id = after
+            query = query.where(
+                or_(
+                    User.created_at < after_created_at,
+                    and_(User.created_at == after_created_at, User.id < after_id),
+                )
+            )
 
         # 分页查询
-        users = query.order_by(User.created_at.desc()).offset(skip).limit(limit).all()
+        result = await self.db.scalars(
+            query.order_by(User.created_at.desc(), User.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+
+        return list(result.all()), total
+
+    async def count_users(self, is_active: Optional[bool] = None) -> int:
+        """精确统计用户数量"""
+        query = select(func.count()).select_from(User)
+        if is_active is not None:
+            query = query.where(User.is_active == is_active)
+        return await self.db.scalar(query)
+
+    async def estimate_count(self, is_active: Optional[bool] = None) -> int:
+        """
+        根据数据库统计信息估算用户数量（不扫描表）
+
+        - PostgreSQL：pg_class.reltuples / EXPLAIN 估算行数
+        - MySQL：information_schema.TABLES.TABLE_ROWS / EXPLAIN 估算行数
+        - SQLite：sqlite_stat1（需执行过 ANALYZE）
+        无可用统计信息时回退为精确计数
+        """
+        dialect = self.db.get_bind().dialect.name
+        table = User.__tablename__
+        estimate: Optional[float] = None
+
+        if dialect == "postgresql":
+            if is_active is None:
+                estimate = await self.db.scalar(
+                    text("SELECT reltuples FROM pg_class WHERE oid = CAST(:t AS regclass)"),
+                    {"t": table},
+                )
+            else:
+                plan = await self.db.scalar(
+                    text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} WHERE is_active = :v"),
+                    {"v": is_active},
+                )
+                estimate = plan[0]["Plan"]["Plan Rows"] if plan else None
+        elif dialect == "mysql":
+            if is_active is None:
+                estimate = await self.db.scalar(
+                    text(
+                        "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t"
+                    ),
+                    {"t": table},
+                )
+            else:
+                result = await self.db.execute(
+                    text(f"EXPLAIN SELECT 1 FROM {table} WHERE is_active = :v"),
+                    {"v": is_active},
+                )
+                row = result.mappings().first()
+                estimate = row["rows"] if row else None
+        elif dialect == "sqlite" and is_active is None:
+            has_stats = await self.db.scalar(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            )
+            if has_stats:
+                stat = await self.db.scalar(
+                    text("SELECT stat FROM sqlite_stat1 WHERE tbl = :t LIMIT 1"),
+                    {"t": table},
+                )
+                estimate = int(stat.split()[0]) if stat else None
 
-        return users, total
+        # reltuples 为 -1 表示从未 ANALYZE
+        if estimate is None or estimate < 0:
+            return await self.count_users(is_active)
+        return int(estimate)
@@ -3,7 +3,13 @@ from app.schemas.user import (
     UserCreate,
     UserUpdate,
     UserResponse,
+    UserListResponse,
+    UserSearchResponse,
+    UserBulkFilter,
+    UserBulkAction,
+    UserBulkActionResponse,
     UserLogin,
+    RefreshTokenRequest,
     TokenResponse,
 )
 from app.schemas.response import UnifiedResponse, SuccessResponse
@@ -13,7 +19,13 @@ __all__ = [
     "UserCreate",
     "UserUpdate",
     "UserResponse",
+    "UserListResponse",
+    "UserSearchResponse",
+    "UserBulkFilter",
+    "UserBulkAction",
+    "UserBulkActionResponse",
     "UserLogin",
+    "RefreshTokenRequest",
     "TokenResponse",
     "UnifiedResponse",
     "SuccessResponse",
@@ -1,4 +1,6 @@
 from datetime import datetime
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -36,6 +38,50 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserListResponse(BaseModel):
+    """用户列表响应模式"""
+
+    items: list[UserResponse]
+    total: int | None = None
+    skip: int
+    limit: int
+    next_cursor: str | None = None
+
+
+class UserSearchResponse(BaseModel):
+    """用户搜索响应模式"""
+
+    items: list[UserResponse]
+    limit: int
+    next_cursor: str | None = None
+    truncated: bool = Field(
+        False, description="全文检索匹配数超过上限，相关度较低的匹配未返回"
+    )
+
+
+class UserBulkFilter(BaseModel):
+    """批量操作筛选条件（条件之间为 AND）"""
+
+    created_before: datetime | None = Field(None, description="创建时间早于")
+    created_after: datetime | None = Field(None, description="创建时间晚于")
+    is_active: bool | None = Field(None, description="是否激活")
+
+
+class UserBulkAction(BaseModel):
+    """批量操作请求模式（ids 与 filter 二选一）"""
+
+    action: Literal["activate", "deactivate", "delete"]
+    ids: list[str] | None = Field(None, min_length=1, max_length=10000)
+    filter: UserBulkFilter | None = None
+
+
+class UserBulkActionResponse(BaseModel):
+    """批量操作响应模式"""
+
+    action: str
+    affected: int = Field(..., description="受影响的用户数")
+
+
 class UserLogin(BaseModel):
     """登录请求模式"""
 
@@ -43,13 +89,19 @@ class UserLogin(BaseModel):
     password: str
 
 
+class RefreshTokenRequest(BaseModel):
+    """刷新令牌请求模式"""
+
+    refresh_token: str
+
+
 class TokenResponse(BaseModel):
     """Token 响应模式（业界标准格式）"""
 
     access_token: str = Field(..., description="访问令牌（JWT）")
     token_type: str = Field(default="Bearer", description="令牌类型")
     expires_in: int | None = Field(None, description="过期时间（秒）")
-    refresh_token: str | None = Field(None, description="刷新令牌（可选）")
+    refresh_token: str | None = Field(None, description="刷新令牌（用于 POST /auth/refresh，只能使用一次）")
 
     class Config:
         populate_by_name = True  # 允许使用字段名或别名
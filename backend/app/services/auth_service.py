@@ -1,28 +1,39 @@
 """认证服务"""
 
-from datetime import timedelta
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
 
 from app.core.config import settings
-from app.core.exceptions import AuthenticationError, AuthorizationError
-from app.core.security import create_access_token
+from app.core.exceptions import AuthenticationError, AuthorizationError, ConflictError
+from app.core.revocation import revocation_list
+from app.core.security import (
+    TOKEN_TYPE_REFRESH,
+    create_access_token,
+    create_refresh_token,
+    verify_token,
+)
+from app.models.revoked_token import RevokedToken
 from app.models.user import User
 from app.schemas.user import TokenResponse
 from app.services.base_service import BaseService
-from app.utils.password import verify_password
+from app.utils.password import verify_password_async
 
 
 class AuthService(BaseService):
     """认证服务"""
 
-    def authenticate_user(self, username: str, password: str) -> User:
+    async def authenticate_user(self, username: str, password: str) -> User:
         """验证用户凭据"""
-        user = self.uow.users.get_by_username(username)
+        user = await self.uow.users.get_by_username(username)
+        # 密码校验耗时较长（bcrypt），校验前归还连接
+        await self.uow.release()
 
         if not user:
             self.logger.warning("登录失败：用户不存在", username=username)
             raise AuthenticationError("用户名或密码错误")
 
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             self.logger.warning("登录失败：密码错误", username=username)
             raise AuthenticationError("用户名或密码错误")
 
@@ -33,24 +44,159 @@ class AuthService(BaseService):
         self.logger.info("用户登录成功", username=username, user_id=user.id)
         return user
 
-    def create_access_token_for_user(self, user: User) -> TokenResponse:
-        """为用户创建访问令牌（业界标准格式）"""
+    def create_access_token_for_user(
+        self, user: User, session_id: str | None = None
+    ) -> TokenResponse:
+        """
+        为用户创建访问令牌与刷新令牌（业界标准格式）
+
+        Args:
+            user: 用户
+            session_id: 登录会话 ID（sid），刷新时沿用原会话，None 表示新登录
+        """
         access_token_expires = timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
+        claims = {"sub": user.username, "sid": session_id or uuid.uuid4().hex}
         access_token = create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
+            data=claims, expires_delta=access_token_expires
         )
 
-        # 业界标准格式：access_token, token_type, expires_in
+        # 业界标准格式：access_token, token_type, expires_in, refresh_token
         return TokenResponse(
             access_token=access_token,
             token_type="Bearer",
             expires_in=int(access_token_expires.total_seconds()),
-            refresh_token=None,  # 可选：后续可以实现刷新令牌
+            refresh_token=create_refresh_token(data=claims),
         )
 
-    def login(self, username: str, password: str) -> TokenResponse:
+    async def login(self, username: str, password: str) -> TokenResponse:
         """用户登录"""
-        user = self.authenticate_user(username, password)
+        user = await self.authenticate_user(username, password)
         return self.create_access_token_for_user(user)
+
+    async def refresh(self, refresh_token: str) -> TokenResponse:
+        """
+        使用刷新令牌换取新的访问令牌与刷新令牌（无需密码校验）
+
+        刷新令牌只能使用一次：旧令牌的 jti 写入 revoked_tokens 表，由主键保证并发刷新只有一个成功。
+        这些 jti 只在数据库中去重，不加载到进程内撤销列表（访问令牌校验本就拒绝刷新令牌）。
+        已使用过的刷新令牌再次出现说明可能被盗用，撤销整个登录会话
+
+        Raises:
+            AuthenticationError: 刷新令牌无效、已过期、已使用或会话已登出
+            AuthorizationError: 用户已被禁用
+        """
+        payload = verify_token(refresh_token)
+        if payload is None or payload.get("type") != TOKEN_TYPE_REFRESH:
+            raise AuthenticationError("无效的刷新令牌")
+
+        jti, session_id, username = payload.get("jti"), payload.get("sid"), payload.get("sub")
+        if not (jti and session_id and username) or revocation_list.is_revoked(session_id):
+            raise AuthenticationError("无效的刷新令牌")
+
+        user = await self.uow.users.get_by_username(username)
+        if not user:
+            raise AuthenticationError("用户不存在")
+        if not user.is_active:
+            raise AuthorizationError("用户已被禁用")
+
+        try:
+            await self.uow.revoked_tokens.add(
+                jti, RevokedToken.KIND_REFRESH, _to_datetime(payload["exp"])
+            )
+            await self.uow.commit()
+        except ConflictError:
+            # 该刷新令牌已被使用过（包括其他请求或其他 worker 的并发刷新）
+            await self.uow.rollback()
+            await self._reuse_detected(session_id, username)
+
+        self.logger.info("刷新令牌成功", username=username, user_id=user.id)
+        return self.create_access_token_for_user(user, session_id=session_id)
+
+    async def logout(self, payload: dict) -> None:
+        """
+        登出：撤销当前登录会话（该会话的访问令牌与刷新令牌全部失效）
+
+        Args:
+            payload: 当前访问令牌的 payload
+        """
+        session_id = payload.get("sid")
+        if session_id:
+            # 会话内任何令牌的过期时间都不会晚于此时签发的刷新令牌
+            await self.revoke(
+                session_id,
+                RevokedToken.KIND_SESSION,
+                time.time() + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+            )
+        elif payload.get("jti"):
+            await self.revoke(payload["jti"], RevokedToken.KIND_ACCESS, payload["exp"])
+        self.logger.info("用户登出", username=payload.get("sub"))
+
+    async def revoke(self, token_id: str, kind: str, expires_at: float) -> None:
+        """
+        撤销访问令牌（jti）或登录会话（sid），重复撤销时忽略
+
+        Args:
+            token_id: jti 或 sid
+            kind: RevokedToken.KIND_ACCESS 或 RevokedToken.KIND_SESSION
+            expires_at: 对应令牌的过期时间（Unix 时间戳）
+        """
+        try:
+            await self.uow.revoked_tokens.add(token_id, kind, _to_datetime(expires_at))
+            await self.uow.commit()
+        except ConflictError:
+            await self.uow.rollback()
+        revocation_list.add(token_id, expires_at)
+
+    async def sync_revocations(self, purge: bool = False) -> int:
+        """
+        从数据库同步撤销列表（启动时全量加载，之后按撤销时间增量同步）
+
+        只加载访问令牌与登录会话的撤销；已轮换的刷新令牌只在数据库中去重
+
+        Args:
+            purge: 是否同时删除数据库中已过期的条目
+
+        Returns:
+            本次新增的条目数
+        """
+        now = datetime.utcnow()
+        since = revocation_list.synced_at
+        if since is not None:
+            # 向前多取一段时间，覆盖同步时尚未提交的撤销（重复加入会被忽略）
+            since -= timedelta(seconds=settings.REVOCATION_SYNC_INTERVAL_SECONDS + 30)
+
+        rows = await self.uow.revoked_tokens.get_active(
+            now,
+            kinds=(RevokedToken.KIND_ACCESS, RevokedToken.KIND_SESSION),
+            revoked_after=since,
+        )
+        added = sum(
+            revocation_list.add(token_id, expires_at.replace(tzinfo=timezone.utc).timestamp())
+            for token_id, expires_at in rows
+        )
+        revocation_list.synced_at = now
+        revocation_list.purge()
+
+        if purge:
+            deleted = await self.uow.revoked_tokens.delete_expired(now)
+            await self.uow.commit()
+            if deleted:
+                self.logger.info("清理过期的撤销记录", count=deleted)
+        return added
+
+    async def _reuse_detected(self, session_id: str, username: str) -> None:
+        """刷新令牌被重复使用：撤销整个登录会话并拒绝本次刷新"""
+        self.logger.warning("刷新令牌被重复使用，撤销登录会话", username=username)
+        await self.revoke(
+            session_id,
+            RevokedToken.KIND_SESSION,
+            time.time() + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        )
+        raise AuthenticationError("刷新令牌已失效，请重新登录")
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    """Unix 时间戳转换为 UTC naive datetime（与数据库中的时间格式一致）"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).replace(tzinfo=None)
@@ -1,26 +1,55 @@
 """用户服务"""
 
-from typing import Optional
-from app.core.exceptions import NotFoundError, ConflictError
+import uuid
+from typing import Any, AsyncIterator, Literal, Optional, Sequence
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy.engine import Row
+
+from app.core.cache import principal_cache, user_count_cache
+from app.core.exceptions import NotFoundError, ConflictError, ValidationError
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.repositories.user_repository import SEARCH_TIER_KEY_LENGTHS
+from app.schemas.user import (
+    UserBulkAction,
+    UserBulkActionResponse,
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+)
 from app.services.base_service import BaseService
-from app.utils.password import get_password_hash
+from app.utils.pagination import (
+    decode_cursor,
+    decode_search_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
+from app.utils.password import (
+    MAX_PASSWORD_BYTES,
+    get_password_hash_async,
+    hash_passwords_async,
+)
+
+# 流式导入的一条原始记录：(行号, 记录, 解析错误)
+ImportRecord = tuple[int, Optional[dict[str, Any]], Optional[str]]
+
+# 导出的列（不包含密码哈希）
+EXPORT_COLUMNS = ("id", "username", "name", "avatar", "is_active", "created_at", "updated_at")
 
 
 class UserService(BaseService):
     """用户服务"""
 
-    def get_user_by_username(self, username: str) -> User:
+    async def get_user_by_username(self, username: str) -> User:
         """根据用户名获取用户"""
-        user = self.uow.users.get_by_username(username)
+        user = await self.uow.users.get_by_username(username)
         if not user:
             raise NotFoundError("用户不存在")
         return user
 
-    def get_user_by_id(self, user_id: str) -> User:
+    async def get_user_by_id(self, user_id: str) -> User:
         """根据 ID 获取用户"""
-        user = self.uow.users.get_by_id(user_id)
+        user = await self.uow.users.get_by_id(user_id)
         if not user:
             raise NotFoundError("用户不存在")
         return user
@@ -29,68 +58,159 @@ class UserService(BaseService):
         """获取当前用户信息"""
         return UserResponse.model_validate(user)
 
-    def get_users(
-        self, skip: int = 0, limit: int = 100, is_active: Optional[bool] = None
-    ) -> tuple[list[UserResponse], int]:
-        """获取用户列表"""
-        users, total = self.uow.users.get_all(
-            skip=skip, limit=limit, is_active=is_active
+    async def get_users(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        is_active: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        total_mode: Literal["exact", "cached", "estimated"] = "exact",
+    ) -> tuple[list[UserResponse], Optional[int], Optional[str]]:
+        """
+        获取用户列表
+
+        传入 cursor 时使用游标分页（忽略 skip），每页开销与第一页相同
+
+        Args:
+            include_total: 是否返回总数（无限滚动客户端可关闭）
+            total_mode: 总数计算方式
+                - exact: 精确 COUNT
+                - cached: 增量维护的计数缓存（过期后重新精确计数）
+                - estimated: 数据库统计信息估算
+
+        Returns:
+            (用户列表, 总数, 下一页游标)，未请求总数时总数为 None，没有下一页时游标为 None
+        """
+        after = decode_cursor(cursor) if cursor else None
+        # 多取一条用于判断是否还有下一页
+        users, total = await self.uow.users.get_all(
+            skip=0 if after else skip,
+            limit=limit + 1,
+            is_active=is_active,
+            after=after,
+            include_total=include_total and total_mode == "exact",
         )
-        return [UserResponse.model_validate(user) for user in users], total
 
-    def create_user(self, user_data: UserCreate) -> UserResponse:
-        """创建用户"""
-        # 检查用户名是否已存在
-        if self.uow.users.is_username_exists(user_data.username):
-            raise ConflictError("用户名已存在")
+        if include_total and total_mode == "cached":
+            total = await self._get_cached_count(is_active)
+        elif include_total and total_mode == "estimated":
+            total = await self.uow.users.estimate_count(is_active)
+
+        # 查询已完成，序列化前归还连接
+        await self.uow.release()
+
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+
+        return [UserResponse.model_validate(user) for user in users], total, next_cursor
+
+    async def search_users(
+        self, q: str, limit: int = 20, cursor: Optional[str] = None
+    ) -> tuple[list[UserResponse], Optional[str], bool]:
+        """
+        搜索用户
+
+        结果按相关度分层：username 前缀匹配（完全匹配最前）> name 前缀匹配 > 全文检索
+
+        Returns:
+            (用户列表, 下一页游标, 是否截断)：没有下一页时游标为 None；
+            全文检索匹配数超过 SEARCH_FULLTEXT_CANDIDATES、其余匹配未返回时截断为 True
+        """
+        after = decode_search_cursor(cursor, SEARCH_TIER_KEY_LENGTHS) if cursor else None
+        # 多取一条用于判断是否还有下一页
+        results, truncated = await self.uow.users.search(q, limit + 1, after)
+        await self.uow.release()
 
-        # 创建用户
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = encode_search_cursor(*results[-1][1])
+
+        return [UserResponse.model_validate(user) for user, _ in results], next_cursor, truncated
+
+    async def _get_cached_count(self, is_active: Optional[bool]) -> int:
+        """获取缓存的用户数量（未命中时精确计数并写入缓存）"""
+        total = user_count_cache.get(is_active)
+        if total is None:
+            total = await self.uow.users.count_users(is_active)
+            user_count_cache.set(is_active, total)
+        return total
+
+    def _adjust_counts(self, is_active: bool, delta: int) -> None:
+        """增量更新用户数量缓存（全部 + 对应激活状态）"""
+        user_count_cache.incr(None, delta)
+        user_count_cache.incr(is_active, delta)
+
+    async def create_user(self, user_data: UserCreate) -> UserResponse:
+        """
+        创建用户
+
+        直接 INSERT，用户名唯一性由唯一索引保证（冲突时抛出 ConflictError），
+        不预先查询用户名是否存在
+        """
+        self.uow.use_primary()
+        # 创建用户（密码哈希在进程池中执行）
+        password_hash = await get_password_hash_async(user_data.password)
         user = User(
             username=user_data.username,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=password_hash,
             name=user_data.name,
             avatar=user_data.avatar,
             is_active=True,
         )
 
-        self.uow.users.create(user)
-        self.uow.commit()
+        await self.uow.users.create(user)
+        await self.uow.commit()
+        self._adjust_counts(user.is_active, 1)
 
         self.logger.info("创建用户成功", user_id=user.id, username=user.username)
         return UserResponse.model_validate(user)
 
-    def update_user(self, user_id: str, user_data: UserUpdate) -> UserResponse:
-        """更新用户"""
-        user = self.get_user_by_id(user_id)
-
-        # 更新字段
-        if user_data.name is not None:
-            user.name = user_data.name
-        if user_data.avatar is not None:
-            user.avatar = user_data.avatar
+    async def update_user(self, user_id: str, user_data: UserUpdate) -> UserResponse:
+        """更新用户（单条 UPDATE ... RETURNING）"""
+        self.uow.use_primary()
+        values = user_data.model_dump(exclude_none=True)
+        if values:
+            user = await self.uow.users.update_by_id(user_id, **values)
+        else:
+            user = await self.uow.users.get_by_id(user_id)
+        if not user:
+            raise NotFoundError("用户不存在")
 
-        self.uow.users.update(user)
-        self.uow.commit()
+        await self.uow.commit()
+        principal_cache.invalidate(user.username)
 
         self.logger.info("更新用户成功", user_id=user.id, username=user.username)
         return UserResponse.model_validate(user)
 
-    def delete_user(self, user_id: str) -> None:
-        """删除用户"""
-        user = self.get_user_by_id(user_id)
+    async def delete_user(self, user_id: str) -> None:
+        """删除用户（单条 DELETE ... RETURNING）"""
+        self.uow.use_primary()
+        deleted = await self.uow.users.delete_by_id(user_id)
+        if deleted is None:
+            raise NotFoundError("用户不存在")
+        username, is_active = deleted
 
-        self.uow.users.delete(user)
-        self.uow.commit()
+        await self.uow.commit()
+        principal_cache.invalidate(username)
+        self._adjust_counts(is_active, -1)
 
-        self.logger.info("删除用户成功", user_id=user.id, username=user.username)
+        self.logger.info("删除用户成功", user_id=user_id, username=username)
 
-    def toggle_user_active(self, user_id: str) -> UserResponse:
-        """切换用户激活状态"""
-        user = self.get_user_by_id(user_id)
-        user.is_active = not user.is_active
+    async def toggle_user_active(self, user_id: str) -> UserResponse:
+        """切换用户激活状态（单条 UPDATE ... RETURNING）"""
+        self.uow.use_primary()
+        user = await self.uow.users.toggle_active(user_id)
+        if not user:
+            raise NotFoundError("用户不存在")
 
-        self.uow.users.update(user)
-        self.uow.commit()
+        await self.uow.commit()
+        principal_cache.invalidate(user.username)
+        user_count_cache.incr(user.is_active, 1)
+        user_count_cache.incr(not user.is_active, -1)
 
         self.logger.info(
             "切换用户激活状态成功",
@@ -99,3 +219,229 @@ class UserService(BaseService):
             is_active=user.is_active,
         )
         return UserResponse.model_validate(user)
+
+    async def bulk_action(self, data: UserBulkAction) -> UserBulkActionResponse:
+        """
+        批量激活 / 禁用 / 删除用户
+
+        按 ID 列表或筛选条件执行单条 UPDATE / DELETE，不逐行加载用户
+
+        Raises:
+            ValidationError: 未指定 ids 与筛选条件，或两者同时指定
+        """
+        criteria = data.filter.model_dump(exclude_none=True) if data.filter else {}
+        if (data.ids is None) == (not criteria):
+            raise ValidationError("请指定 ids 或筛选条件（二选一）")
+
+        self.uow.use_primary()
+        if data.action == "delete":
+            affected = await self.uow.users.bulk_delete(ids=data.ids, **criteria)
+        else:
+            active = data.action == "activate"
+            affected = await self.uow.users.bulk_set_active(active, ids=data.ids, **criteria)
+        await self.uow.commit()
+
+        if affected:
+            # 不加载被修改的用户，无法逐个失效，直接清空 principal 缓存
+            principal_cache.clear()
+            if data.action == "delete":
+                # 被删除用户的激活状态未知，计数缓存全部重新精确计数
+                user_count_cache.clear()
+            else:
+                user_count_cache.incr(active, affected)
+                user_count_cache.incr(not active, -affected)
+
+        self.logger.info(
+            "批量操作用户成功", action=data.action, affected=affected, **criteria
+        )
+        return UserBulkActionResponse(action=data.action, affected=affected)
+
+    async def import_users(
+        self, records: AsyncIterator[ImportRecord], batch_size: int
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        批量导入用户（流式）
+
+        按批次校验、并行哈希密码、批量插入并逐批提交，内存占用与导入数据量无关
+
+        Args:
+            records: 原始记录流（见 app.utils.streaming.iter_records）
+            batch_size: 每批行数
+
+        Yields:
+            每行的导入结果，最后一条为汇总 {"summary": {...}}
+        """
+        self.uow.use_primary()
+        created = failed = 0
+        batch: list[ImportRecord] = []
+
+        async def flush() -> AsyncIterator[dict[str, Any]]:
+            nonlocal created, failed
+            for result in await self._import_batch(batch):
+                if result["status"] == "created":
+                    created += 1
+                else:
+                    failed += 1
+                yield result
+            batch.clear()
+
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                async for result in flush():
+                    yield result
+        if batch:
+            async for result in flush():
+                yield result
+
+        self.logger.info("批量导入用户完成", created=created, failed=failed)
+        yield {"summary": {"total": created + failed, "created": created, "failed": failed}}
+
+    async def _import_batch(self, batch: list[ImportRecord]) -> list[dict[str, Any]]:
+        """导入一批记录，返回按行号排序的结果"""
+        results: dict[int, dict[str, Any]] = {}
+        valid: list[tuple[int, UserCreate]] = []
+        seen: set[str] = set()
+
+        for line, record, error in batch:
+            if error is not None:
+                results[line] = {"line": line, "status": "failed", "error": error}
+                continue
+            try:
+                user_data = UserCreate.model_validate(record)
+            except PydanticValidationError as e:
+                results[line] = {
+                    "line": line,
+                    "status": "failed",
+                    "username": record.get("username"),
+                    "error": "; ".join(
+                        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                        for err in e.errors()
+                    ),
+                }
+                continue
+            if len(user_data.password.encode("utf-8")) > MAX_PASSWORD_BYTES:
+                results[line] = {
+                    "line": line,
+                    "status": "failed",
+                    "username": user_data.username,
+                    "error": f"password: 密码长度不能超过 {MAX_PASSWORD_BYTES} 字节",
+                }
+                continue
+            if user_data.username in seen:
+                results[line] = {
+                    "line": line,
+                    "status": "failed",
+                    "username": user_data.username,
+                    "error": "用户名重复",
+                }
+                continue
+            seen.add(user_data.username)
+            valid.append((line, user_data))
+
+        # 单次查询批量检查用户名
+        existing = await self.uow.users.get_existing_usernames(seen)
+        # 密码哈希耗时较长（bcrypt），哈希前结束事务并归还连接，避免长时间占用主库
+        # （SQLite 调优模式下为写锁）；期间并发创建的同名用户由 _insert_rows 逐行重试处理
+        await self.uow.release()
+        pending = []
+        for line, user_data in valid:
+            if user_data.username in existing:
+                results[line] = {
+                    "line": line,
+                    "status": "failed",
+                    "username": user_data.username,
+                    "error": "用户名已存在",
+                }
+            else:
+                pending.append((line, user_data))
+
+        # 单个密码哈希失败（如进程池已满）只影响该行
+        password_hashes = await hash_passwords_async(
+            [user_data.password for _, user_data in pending], return_exceptions=True
+        )
+        hashed = []
+        for (line, user_data), password_hash in zip(pending, password_hashes):
+            if isinstance(password_hash, Exception):
+                results[line] = {
+                    "line": line,
+                    "status": "failed",
+                    "username": user_data.username,
+                    "error": getattr(password_hash, "detail", None) or str(password_hash),
+                }
+            else:
+                hashed.append(((line, user_data), password_hash))
+        pending = [item for item, _ in hashed]
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "username": user_data.username,
+                "password_hash": password_hash,
+                "name": user_data.name,
+                "avatar": user_data.avatar,
+                "is_active": True,
+            }
+            for (_, user_data), password_hash in hashed
+        ]
+
+        inserted = await self._insert_rows(rows)
+        for (line, user_data), row, ok in zip(pending, rows, inserted):
+            if ok:
+                results[line] = {
+                    "line": line,
+                    "status": "created",
+                    "id": row["id"],
+                    "username": user_data.username,
+                }
+            else:
+                results[line] = {
+                    "line": line,
+                    "status": "failed",
+                    "username": user_data.username,
+                    "error": "用户名已存在",
+                }
+        self._adjust_counts(True, sum(inserted))
+
+        return [results[line] for line in sorted(results)]
+
+    async def _insert_rows(self, rows: list[dict[str, Any]]) -> list[bool]:
+        """
+        批量插入并提交，返回每行是否成功
+
+        并发创建导致唯一约束冲突时，回滚整批并逐行重试以定位冲突行
+        """
+        if not rows:
+            return []
+        try:
+            await self.uow.users.bulk_create(rows)
+            await self.uow.commit()
+            return [True] * len(rows)
+        except ConflictError:
+            await self.uow.rollback()
+
+        inserted = []
+        for row in rows:
+            try:
+                await self.uow.users.bulk_create([row])
+                await self.uow.commit()
+                inserted.append(True)
+            except ConflictError:
+                await self.uow.rollback()
+                inserted.append(False)
+        return inserted
+
+    async def export_users(
+        self, is_active: Optional[bool] = None, chunk_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        导出用户（流式）
+
+        通过服务端游标按 (created_at, id) 顺序分批读取，列见 EXPORT_COLUMNS
+
+        Yields:
+            每批行（元组）
+        """
+        async for rows in self.uow.users.stream_rows(
+            EXPORT_COLUMNS, is_active=is_active, chunk_size=chunk_size
+        ):
+            yield rows
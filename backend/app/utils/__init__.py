@@ -1,3 +1,27 @@
-from app.utils.password import verify_password, get_password_hash
+from app.utils.password import (
+    verify_password,
+    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    hash_passwords_async,
+    password_hasher,
+)
+from app.utils.pagination import (
+    encode_cursor,
+    decode_cursor,
+    encode_search_cursor,
+    decode_search_cursor,
+)
 
-__all__ = ["verify_password", "get_password_hash"]
+__all__ = [
+    "verify_password",
+    "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
+    "hash_passwords_async",
+    "password_hasher",
+    "encode_cursor",
+    "decode_cursor",
+    "encode_search_cursor",
+    "decode_search_cursor",
+]
@@ -0,0 +1,92 @@
+"""分页游标工具"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Mapping, Sequence
+
+from app.core.exceptions import ValidationError
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """
+    生成不透明的分页游标
+
+    Args:
+        created_at: 当前页最后一条记录的创建时间
+        id: 当前页最后一条记录的 ID
+
+    Returns:
+        URL 安全的 base64 字符串
+    """
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    解析分页游标
+
+    Args:
+        cursor: encode_cursor 生成的游标
+
+    Returns:
+        (created_at, id)
+
+    Raises:
+        ValidationError: 游标格式无效时
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise ValidationError("无效的分页游标")
+
+
+def encode_search_cursor(tier: int, key: Sequence[Any]) -> str:
+    """
+    生成搜索结果的分页游标
+
+    Args:
+        tier: 当前页最后一条记录所在的排名层级
+        key: 该记录在层级内的排序键（如 [username] 或 [score, id]）
+
+    Returns:
+        URL 安全的 base64 字符串
+    """
+    raw = json.dumps([tier, list(key)], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(
+    cursor: str, key_lengths: Mapping[int, int]
+) -> tuple[int, list[Any]]:
+    """
+    解析搜索结果的分页游标
+
+    Args:
+        cursor: encode_search_cursor 生成的游标
+        key_lengths: 各层级排序键的长度（层级 -> 长度），不在其中的层级视为无效
+
+    Returns:
+        (层级, 排序键)
+
+    Raises:
+        ValidationError: 游标格式无效时
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tier, key = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValidationError("无效的分页游标")
+    # 游标来自客户端：层级、键长度与键元素类型都需要校验（bool 是 int 的子类，需排除）
+    if (
+        type(tier) is not int
+        or tier not in key_lengths
+        or not isinstance(key, list)
+        or len(key) != key_lengths[tier]
+        or not all(type(value) in (str, int, float) for value in key)
+    ):
+        raise ValidationError("无效的分页游标")
+    return tier, key
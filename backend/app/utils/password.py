@@ -1,5 +1,20 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.metrics import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_REJECTED,
+    PASSWORD_HASH_WAIT,
+)
+
 # 密码加密上下文（兼容 bcrypt 5.x）
 pwd_context = CryptContext(
     schemes=["bcrypt"],
@@ -16,9 +31,153 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+# bcrypt 限制密码长度不超过 72 字节
+MAX_PASSWORD_BYTES = 72
+
+
 def get_password_hash(password: str) -> str:
     """生成密码哈希"""
-    # bcrypt 限制密码长度不超过 72 字节
-    if len(password.encode('utf-8')) > 72:
-        raise ValueError("密码长度不能超过 72 字节")
+    if len(password.encode('utf-8')) > MAX_PASSWORD_BYTES:
+        raise ValueError(f"密码长度不能超过 {MAX_PASSWORD_BYTES} 字节")
     return pwd_context.hash(password)
+
+
+def _run_timed(fn: Callable[..., Any], *args: Any) -> tuple[float, float, Any]:
+    """在工作进程中执行任务，返回（开始时间戳、耗时、结果）"""
+    started_at = time.time()
+    result = fn(*args)
+    return started_at, time.time() - started_at, result
+
+
+class PasswordHasherPool:
+    """
+    密码哈希进程池
+
+    bcrypt 是 CPU 密集型操作（rounds=12 约 250ms），直接在 async 路由中执行会阻塞
+    整个事件循环。此进程池将哈希/校验移出事件循环，并限制排队任务数：
+    超过上限时立即抛出 ServiceUnavailableError（503），避免登录风暴拖垮其他接口。
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        """
+        初始化进程池
+
+        Args:
+            max_workers: 工作进程数（0 表示使用 CPU 核数）
+            max_pending: 最大待处理任务数（执行中 + 排队中）
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_duration = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """获取（按需创建）进程池"""
+        if self._executor is None:
+            # 使用 spawn，避免在已启动线程的进程中 fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        在进程池中执行密码任务
+
+        Raises:
+            ServiceUnavailableError: 待处理任务数超过上限时
+        """
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            raise ServiceUnavailableError("服务繁忙，请稍后重试")
+
+        self._pending += 1
+        submitted_at = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            started_at, duration, result = await loop.run_in_executor(
+                self._get_executor(), _run_timed, fn, *args
+            )
+        finally:
+            self._pending -= 1
+
+        wait = max(started_at - submitted_at, 0.0)
+        self._completed += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        self._total_duration += duration
+        PASSWORD_HASH_WAIT.observe(wait)
+        PASSWORD_HASH_DURATION.labels(fn.__name__).observe(duration)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """获取进程池运行状态（队列深度、等待时间等）"""
+        completed = self._completed or 1
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "queue_depth": max(self._pending - self.max_workers, 0),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._total_wait / completed * 1000, 3),
+            "max_wait_ms": round(self._max_wait * 1000, 3),
+            "avg_duration_ms": round(self._total_duration / completed * 1000, 3),
+        }
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# 全局密码进程池（每个 worker 进程一个）
+password_hasher = PasswordHasherPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """验证密码（在密码进程池中执行，不阻塞事件循环）"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """生成密码哈希（在密码进程池中执行，不阻塞事件循环）"""
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def hash_passwords_async(
+    passwords: list[str], return_exceptions: bool = False
+) -> list[str | Exception]:
+    """
+    批量生成密码哈希（并行）
+
+    并发数不超过进程池大小，避免批量任务占满待处理队列导致登录请求被拒绝（503）
+
+    Args:
+        passwords: 密码列表
+        return_exceptions: 为 True 时单个密码的错误（如进程池已满）作为结果返回，
+            不影响其他密码；为 False 时直接抛出
+    """
+    semaphore = asyncio.Semaphore(password_hasher.max_workers)
+
+    async def hash_one(password: str) -> str | Exception:
+        async with semaphore:
+            try:
+                return await get_password_hash_async(password)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+    return list(await asyncio.gather(*(hash_one(password) for password in passwords)))
@@ -0,0 +1,167 @@
+"""流式导入/导出工具（NDJSON / CSV）"""
+
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Literal, Sequence
+
+from app.core.exceptions import ValidationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 为可选依赖
+    orjson = None
+
+StreamFormat = Literal["ndjson", "csv"]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+_FORMAT_BY_MEDIA_TYPE: dict[str, StreamFormat] = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+    "text/csv": "csv",
+}
+
+# 单行最大长度（字符），超出的行按错误处理并跳过，保证内存占用有上限
+MAX_LINE_LENGTH = 64 * 1024
+
+
+def detect_stream_format(content_type: str | None) -> StreamFormat:
+    """
+    根据 Content-Type 判断数据格式
+
+    Raises:
+        ValidationError: 不支持的格式
+    """
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    stream_format = _FORMAT_BY_MEDIA_TYPE.get(media_type)
+    if stream_format is None:
+        raise ValidationError(
+            "不支持的数据格式，请使用 application/x-ndjson 或 text/csv"
+        )
+    return stream_format
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, str | None]]:
+    """
+    将字节流按行切分（增量解码 UTF-8）
+
+    Yields:
+        (行号, 行内容)；超过 MAX_LINE_LENGTH 的行内容为 None
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    line_no = 0
+    skipping = False
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_no += 1
+            if skipping:
+                skipping = False
+                yield line_no, None
+            else:
+                yield line_no, line.rstrip("\r")
+        if len(buffer) > MAX_LINE_LENGTH:
+            skipping = True
+            buffer = ""
+
+    buffer += decoder.decode(b"", final=True)
+    if skipping:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, buffer.rstrip("\r")
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], stream_format: StreamFormat
+) -> AsyncIterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """
+    将 NDJSON / CSV 字节流解析为记录（空行跳过）
+
+    CSV 第一行为表头；每行独立解析，不支持跨行的引号字段
+
+    Yields:
+        (行号, 记录, 错误信息)：解析成功时错误信息为 None，失败时记录为 None
+    """
+    header: list[str] | None = None
+
+    async for line_no, line in iter_lines(chunks):
+        if line is None:
+            yield line_no, None, "单行数据过长"
+            continue
+        if not line.strip():
+            continue
+
+        if stream_format == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_no, None, "JSON 格式错误"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "每行必须是 JSON 对象"
+                continue
+            yield line_no, record, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_no, None, f"列数与表头不一致（期望 {len(header)} 列）"
+            continue
+        # 空字符串视为未填写（如 avatar）
+        yield line_no, {k: v for k, v in zip(header, values) if v != ""}, None
+
+
+def encode_ndjson(record: dict[str, Any]) -> bytes:
+    """编码一行 NDJSON"""
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_ndjson_rows(keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """将一批行（元组）编码为 NDJSON（优先使用 orjson）"""
+    if orjson is not None:
+        return b"".join(
+            orjson.dumps(dict(zip(keys, row)), default=_json_default) + b"\n"
+            for row in rows
+        )
+    return "".join(
+        json.dumps(dict(zip(keys, row)), ensure_ascii=False, default=_json_default) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_csv_rows(rows: Iterable[Sequence[Any]]) -> bytes:
+    """将一批行（元组）编码为 CSV"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1 @@
+"""API 性能基准测试"""
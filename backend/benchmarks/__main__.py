@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+API 性能基准测试
+
+默认在进程内通过 httpx ASGITransport 直接驱动应用（使用临时 SQLite 数据库），
+指定 --base-url 时改为通过真实 socket 压测已启动的服务（如 python run.py）。
+
+用法：
+    python -m benchmarks                                  # 进程内运行
+    python -m benchmarks --save benchmarks/baseline.json  # 保存基线
+    python -m benchmarks --compare benchmarks/baseline.json --tolerance 0.2
+    python -m benchmarks --base-url http://127.0.0.1:8000 # 压测运行中的服务
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from benchmarks.harness import (
+    compare_with_baseline,
+    format_results,
+    prepare_context,
+    run_scenario,
+    save_baseline,
+)
+from benchmarks.scenarios import SCENARIOS, BenchmarkContext
+
+# 进程内模式预先写入的用户数（保证大分页场景有足够数据）
+SEED_USERS = 2000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="API 性能基准测试")
+    parser.add_argument("--base-url", help="压测运行中的服务（不指定则进程内运行）")
+    parser.add_argument("--requests", type=int, default=500, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发数")
+    parser.add_argument("--scenario", action="append", help="只运行指定场景（可重复）")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--save", type=Path, help="将结果保存为基线 JSON")
+    parser.add_argument("--compare", type=Path, help="与基线 JSON 对比")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="允许的性能回退比例（默认 0.2）"
+    )
+    return parser.parse_args()
+
+
+def setup_in_process_app():
+    """
+    准备进程内运行的应用
+
+    必须在导入 app 之前设置环境变量：数据库与引擎在导入时创建。
+    """
+    tmpdir = tempfile.mkdtemp(prefix="benchmark-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmpdir}/benchmark.db"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ.setdefault("DEBUG", "false")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+    from app.db_init import init_db
+
+    init_db()
+    seed_users(SEED_USERS)
+
+    from app.main import app
+
+    return app
+
+
+def seed_users(count: int) -> None:
+    """批量写入测试用户（共用一个密码哈希，避免 bcrypt 拖慢准备阶段）"""
+    from app.core.database import SessionLocal
+    from app.models import User
+    from app.utils.password import get_password_hash
+
+    password_hash = get_password_hash("bench123")
+    db = SessionLocal()
+    try:
+        db.add_all(
+            User(
+                username=f"seed_{i:05d}",
+                name=f"Seed {i}",
+                password_hash=password_hash,
+                is_active=i % 5 != 0,
+            )
+            for i in range(count)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run(args: argparse.Namespace) -> list:
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+        mode = "socket"
+    else:
+        app = setup_in_process_app()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=30
+        )
+        mode = "asgi"
+
+    scenarios = SCENARIOS
+    if args.scenario:
+        scenarios = [s for s in SCENARIOS if s.name in args.scenario]
+
+    ctx = BenchmarkContext(username=args.username, password=args.password)
+    results = []
+    try:
+        async with client:
+            await prepare_context(client, ctx)
+            for scenario in scenarios:
+                results.append(
+                    await run_scenario(
+                        client, ctx, scenario, args.requests, args.concurrency
+                    )
+                )
+    finally:
+        if mode == "asgi":
+            from app.core.database import dispose_async_engines
+            from app.utils.password import password_hasher
+
+            password_hasher.shutdown()
+            await dispose_async_engines()
+
+    args.mode = mode
+    return results
+
+
+def main() -> int:
+    args = parse_args()
+    results = asyncio.run(run(args))
+    print(format_results(results))
+
+    meta = {
+        "mode": args.mode,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+    }
+    if args.save:
+        save_baseline(args.save, results, meta)
+        print(f"\n基线已保存: {args.save}")
+
+    if args.compare:
+        regressions = compare_with_baseline(args.compare, results, args.tolerance)
+        if regressions:
+            print(f"\n❌ 性能回退（容差 {args.tolerance:.0%}）：")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"\n✅ 未发现超过 {args.tolerance:.0%} 的性能回退")
+
+    failed = [r.name for r in results if r.errors]
+    if failed:
+        print(f"\n❌ 存在错误响应的场景: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""基准测试执行、统计与基线对比"""
+
+import asyncio
+import json
+import platform
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.scenarios import API_PREFIX, BenchmarkContext, Scenario
+
+
+@dataclass
+class ScenarioResult:
+    """单个场景的测试结果"""
+
+    name: str
+    requests: int
+    errors: int
+    duration: float
+    throughput: float  # 请求数/秒
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """计算分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q * len(sorted_values) + 0.5)) - 1, len(sorted_values) - 1)
+    return sorted_values[max(index, 0)]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    ctx: BenchmarkContext,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int = 5,
+) -> ScenarioResult:
+    """
+    以固定并发执行场景
+
+    Args:
+        client: HTTP 客户端
+        ctx: 场景上下文
+        scenario: 场景
+        requests: 请求总数
+        concurrency: 并发数
+        warmup: 预热请求数（不计入统计）
+    """
+    if scenario.max_requests is not None:
+        requests = min(requests, scenario.max_requests)
+
+    for _ in range(warmup):
+        await scenario.request(client, ctx)
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await scenario.request(client, ctx)
+                ok = response.status_code == scenario.expected_status
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        name=scenario.name,
+        requests=len(latencies),
+        errors=errors,
+        duration=round(duration, 4),
+        throughput=round(len(latencies) / duration, 2) if duration else 0.0,
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 3),
+        p95_ms=round(percentile(latencies, 0.95) * 1000, 3),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 3),
+    )
+
+
+async def prepare_context(client: httpx.AsyncClient, ctx: BenchmarkContext) -> None:
+    """登录并创建用于读写场景的测试用户"""
+    response = await client.post(
+        f"{API_PREFIX}/auth/login",
+        json={"username": ctx.username, "password": ctx.password},
+    )
+    response.raise_for_status()
+    ctx.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.post(
+        f"{API_PREFIX}/users",
+        json={
+            "username": f"bench_target_{int(time.time() * 1000)}",
+            "name": "Benchmark Target",
+            "password": "bench123",
+        },
+        headers=ctx.headers,
+    )
+    response.raise_for_status()
+    ctx.user_id = response.json()["data"]["id"]
+
+
+def save_baseline(path: Path, results: list[ScenarioResult], meta: dict) -> None:
+    """保存基线 JSON"""
+    payload = {
+        "meta": {
+            **meta,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": {result.name: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def compare_with_baseline(
+    path: Path, results: list[ScenarioResult], tolerance: float
+) -> list[str]:
+    """
+    与基线对比
+
+    吞吐量下降或 p95 延迟上升超过 tolerance（比例）即视为回退
+
+    Returns:
+        回退描述列表（为空表示没有回退）
+    """
+    baseline = json.loads(path.read_text(encoding="utf-8"))["scenarios"]
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        if result.errors > base["errors"]:
+            regressions.append(
+                f"{result.name}: errors {base['errors']} -> {result.errors}"
+            )
+        if result.throughput < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: throughput {base['throughput']:.1f} -> "
+                f"{result.throughput:.1f} req/s"
+            )
+        if result.p95_ms > base["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: p95 {base['p95_ms']:.2f} -> {result.p95_ms:.2f} ms"
+            )
+    return regressions
+
+
+def format_results(results: list[ScenarioResult]) -> str:
+    """格式化结果表格"""
+    header = (
+        f"{'scenario':<18}{'requests':>9}{'errors':>8}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<18}{r.requests:>9}{r.errors:>8}{r.throughput:>10.1f}"
+            f"{r.p50_ms:>10.2f}{r.p95_ms:>10.2f}{r.p99_ms:>10.2f}"
+        )
+    return "\n".join(lines)
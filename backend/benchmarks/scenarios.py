@@ -0,0 +1,99 @@
+"""基准测试场景"""
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+
+API_PREFIX = "/api/v1"
+
+
+@dataclass
+class BenchmarkContext:
+    """场景共享上下文（登录凭据、测试用户等）"""
+
+    username: str
+    password: str
+    headers: dict[str, str] = field(default_factory=dict)
+    user_id: str | None = None
+    counter: itertools.count = field(default_factory=itertools.count)
+
+
+@dataclass
+class Scenario:
+    """基准测试场景"""
+
+    name: str
+    request: Callable[[httpx.AsyncClient, BenchmarkContext], Awaitable[httpx.Response]]
+    expected_status: int = 200
+    # 单独的请求数上限（如登录受 bcrypt 限制，默认请求数会过长）
+    max_requests: int | None = None
+
+
+async def _login(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    return await client.post(
+        f"{API_PREFIX}/auth/login",
+        json={"username": ctx.username, "password": ctx.password},
+    )
+
+
+async def _auth_me(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    return await client.get(f"{API_PREFIX}/auth/me", headers=ctx.headers)
+
+
+async def _users_me(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    return await client.get(f"{API_PREFIX}/users/me", headers=ctx.headers)
+
+
+def _list_users(limit: int):
+    async def request(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+        return await client.get(
+            f"{API_PREFIX}/users", params={"limit": limit}, headers=ctx.headers
+        )
+
+    return request
+
+
+async def _get_user(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    return await client.get(f"{API_PREFIX}/users/{ctx.user_id}", headers=ctx.headers)
+
+
+async def _create_user(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    return await client.post(
+        f"{API_PREFIX}/users",
+        json={
+            "username": f"bench_{id(ctx):x}_{next(ctx.counter)}",
+            "name": "Benchmark",
+            "password": "bench123",
+        },
+        headers=ctx.headers,
+    )
+
+
+async def _update_user(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    return await client.put(
+        f"{API_PREFIX}/users/{ctx.user_id}",
+        json={"name": f"Benchmark {next(ctx.counter)}"},
+        headers=ctx.headers,
+    )
+
+
+async def _toggle_user(client: httpx.AsyncClient, ctx: BenchmarkContext) -> httpx.Response:
+    return await client.patch(
+        f"{API_PREFIX}/users/{ctx.user_id}/toggle-active", headers=ctx.headers
+    )
+
+
+SCENARIOS: list[Scenario] = [
+    Scenario("login", _login, max_requests=50),
+    Scenario("auth_me", _auth_me),
+    Scenario("users_me", _users_me),
+    Scenario("list_users_10", _list_users(10)),
+    Scenario("list_users_100", _list_users(100)),
+    Scenario("list_users_1000", _list_users(1000)),
+    Scenario("get_user", _get_user),
+    Scenario("create_user", _create_user, expected_status=201, max_requests=50),
+    Scenario("update_user", _update_user),
+    Scenario("toggle_user", _toggle_user),
+]
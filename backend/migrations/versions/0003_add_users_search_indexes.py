@@ -0,0 +1,82 @@
+"""add users search indexes
+
+GET /users/search：
+- 前缀匹配：username 唯一索引（已有）+ (name, id) 索引
+- 全文检索：
+  - SQLite：FTS5 外部内容表 users_fts，由触发器与 users 表保持同步
+  - PostgreSQL：to_tsvector('simple', username || ' ' || name) 表达式 GIN 索引
+  - MySQL：(username, name) ngram FULLTEXT 索引
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_name_id", "users", ["name", "id"], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        # 外部内容表：只保存倒排索引，内容从 users 表按 rowid 读取
+        # prefix='2 3'：为 2、3 个字符的前缀建立索引，加速前缀查询
+        op.execute(
+            "CREATE VIRTUAL TABLE users_fts USING fts5("
+            "username, name, content='users', content_rowid='rowid', "
+            "tokenize='unicode61', prefix='2 3')"
+        )
+        op.execute(
+            "CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN "
+            "INSERT INTO users_fts(rowid, username, name) "
+            "VALUES (new.rowid, new.username, new.name); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN "
+            "INSERT INTO users_fts(users_fts, rowid, username, name) "
+            "VALUES ('delete', old.rowid, old.username, old.name); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER users_fts_au AFTER UPDATE OF username, name ON users BEGIN "
+            "INSERT INTO users_fts(users_fts, rowid, username, name) "
+            "VALUES ('delete', old.rowid, old.username, old.name); "
+            "INSERT INTO users_fts(rowid, username, name) "
+            "VALUES (new.rowid, new.username, new.name); "
+            "END"
+        )
+        # 为已有数据建立索引
+        op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_users_search ON users "
+            "USING GIN (to_tsvector('simple', username || ' ' || name))"
+        )
+    elif dialect == "mysql":
+        op.execute(
+            "CREATE FULLTEXT INDEX ix_users_search ON users (username, name) WITH PARSER ngram"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS users_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS users_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS users_fts_ai")
+        op.execute("DROP TABLE IF EXISTS users_fts")
+    elif dialect in ("postgresql", "mysql"):
+        op.drop_index("ix_users_search", table_name="users")
+
+    op.drop_index("ix_users_name_id", table_name="users")
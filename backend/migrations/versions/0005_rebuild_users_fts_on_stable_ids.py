@@ -0,0 +1,116 @@
+"""rebuild users_fts on stable document ids (SQLite)
+
+迁移 0003 的 users_fts 是以 users 表隐式 rowid 关联的外部内容表；users 的主键是字符串，
+VACUUM 可能重新编号 rowid，之后全文检索会返回错误的用户。
+
+改为：
+- users_fts_docs(doc_id INTEGER PRIMARY KEY, user_id UNIQUE)：文档 ID 与用户 ID 的映射，
+  显式 INTEGER PRIMARY KEY 不会被 VACUUM 改变
+- users_fts：无内容（content=''）FTS5 表，rowid 为 doc_id，只保存倒排索引
+- 触发器按 users.id 维护映射与索引
+
+其他数据库不受影响。
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _drop_fts() -> None:
+    op.execute("DROP TRIGGER IF EXISTS users_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_ai")
+    op.execute("DROP TABLE IF EXISTS users_fts")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    _drop_fts()
+    op.execute(
+        "CREATE TABLE users_fts_docs ("
+        "doc_id INTEGER PRIMARY KEY, "
+        "user_id VARCHAR(36) NOT NULL UNIQUE)"
+    )
+    # prefix='2 3'：为 2、3 个字符的前缀建立索引，加速前缀查询
+    op.execute(
+        "CREATE VIRTUAL TABLE users_fts USING fts5("
+        "username, name, content='', tokenize='unicode61', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN "
+        "INSERT INTO users_fts_docs(user_id) VALUES (new.id); "
+        "INSERT INTO users_fts(rowid, username, name) "
+        "SELECT doc_id, new.username, new.name FROM users_fts_docs WHERE user_id = new.id; "
+        "END"
+    )
+    # 无内容表删除索引条目时需要提供原始值
+    op.execute(
+        "CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, username, name) "
+        "SELECT 'delete', doc_id, old.username, old.name FROM users_fts_docs WHERE user_id = old.id; "
+        "DELETE FROM users_fts_docs WHERE user_id = old.id; "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_au AFTER UPDATE OF username, name ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, username, name) "
+        "SELECT 'delete', doc_id, old.username, old.name FROM users_fts_docs WHERE user_id = old.id; "
+        "INSERT INTO users_fts(rowid, username, name) "
+        "SELECT doc_id, new.username, new.name FROM users_fts_docs WHERE user_id = new.id; "
+        "END"
+    )
+    # 为已有数据建立映射与索引
+    op.execute("INSERT INTO users_fts_docs(user_id) SELECT id FROM users")
+    op.execute(
+        "INSERT INTO users_fts(rowid, username, name) "
+        "SELECT d.doc_id, u.username, u.name FROM users_fts_docs d JOIN users u ON u.id = d.user_id"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    _drop_fts()
+    op.execute("DROP TABLE IF EXISTS users_fts_docs")
+    # 恢复迁移 0003 的外部内容表
+    op.execute(
+        "CREATE VIRTUAL TABLE users_fts USING fts5("
+        "username, name, content='users', content_rowid='rowid', "
+        "tokenize='unicode61', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN "
+        "INSERT INTO users_fts(rowid, username, name) "
+        "VALUES (new.rowid, new.username, new.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, username, name) "
+        "VALUES ('delete', old.rowid, old.username, old.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_au AFTER UPDATE OF username, name ON users BEGIN "
+        "INSERT INTO users_fts(users_fts, rowid, username, name) "
+        "VALUES ('delete', old.rowid, old.username, old.name); "
+        "INSERT INTO users_fts(rowid, username, name) "
+        "VALUES (new.rowid, new.username, new.name); "
+        "END"
+    )
+    op.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
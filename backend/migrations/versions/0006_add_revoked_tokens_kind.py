@@ -0,0 +1,36 @@
+"""add revoked_tokens.kind
+
+区分撤销类型：access（访问令牌 jti）、session（登录会话 sid）、refresh（已轮换的刷新令牌 jti）。
+各 worker 只把 access / session 加载到进程内撤销列表，refresh 只用于数据库主键去重。
+已有记录无法区分类型，统一标记为 session（仍会加载，过期后清理）。
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("revoked_tokens") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "kind", sa.String(length=16), nullable=False, server_default="session"
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("revoked_tokens") as batch_op:
+        batch_op.drop_column("kind")
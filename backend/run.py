@@ -1,6 +1,13 @@
 #!/usr/bin/env python3
-"""FastAPI 应用启动脚本"""
+"""
+FastAPI 应用启动脚本
 
+    python run.py                  # DEBUG=True：开发模式（单进程 + 热重载）
+    python run.py --prod           # 生产模式（预加载 + 多 worker，DEBUG=False 时默认）
+    python run.py --prod --workers 4
+"""
+
+import argparse
 import sys
 from pathlib import Path
 
@@ -12,10 +19,30 @@ import uvicorn
 
 from app.core.config import settings
 
-if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.DEBUG,
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="启动 FastAPI 应用")
+    parser.add_argument(
+        "--prod", action="store_true", help="生产模式（多 worker，不启用热重载）"
     )
+    parser.add_argument(
+        "--workers", type=int, help="worker 进程数（默认 Settings.WORKERS，0 表示按 CPU 核数）"
+    )
+    args = parser.parse_args()
+
+    if settings.DEBUG and not args.prod:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=True,
+        )
+        return
+
+    from app.core.server import run_production
+
+    run_production(workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
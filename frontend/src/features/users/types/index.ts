@@ -36,6 +36,8 @@ export interface UsersListResponse {
   total: number
   skip: number
   limit: number
+  /** 下一页游标（没有下一页时为 null） */
+  next_cursor?: string | null
 }
 
 /** 用户列表查询参数 */
@@ -43,4 +45,6 @@ export interface UsersListParams {
   skip?: number
   limit?: number
   is_active?: boolean
+  /** 游标分页：上一页返回的 next_cursor（传入时忽略 skip） */
+  cursor?: string
 }